@@ -0,0 +1,19 @@
+"""One-time .env loading shared by the config modules."""
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+
+# Read when tokenizers load; .env values take precedence. Thread caps are applied per
+# ONNX session and llama instead (EMBED_THREADS, NER_THREADS, LLM_THREADS)
+_ENV_DEFAULTS = {
+    "TOKENIZERS_PARALLELISM": "false",
+}
+
+
+@lru_cache(maxsize=1)
+def init_env() -> bool:
+    """Load .env into os.environ on first call; later calls are no-ops."""
+    loaded = load_dotenv()
+    for key, value in _ENV_DEFAULTS.items():
+        os.environ.setdefault(key, value)
+    return loaded
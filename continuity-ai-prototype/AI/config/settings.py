@@ -1,10 +1,11 @@
 # settings.py
 """Configuration settings for entity extraction."""
 import os
+from importlib.util import find_spec
 from pathlib import Path
-from dotenv import load_dotenv
+from config._env import init_env
 
-load_dotenv()
+init_env()
 
 # ---------------- Model Configuration ----------------
 # Primary (legacy) model path (used elsewhere in the app)
@@ -33,6 +34,9 @@ else:
 # Use BERT-base NER (reliable, well-tested)
 NER_MODEL_NAME = os.getenv("NER_MODEL_NAME", "dslim/bert-base-NER")
 NER_CONFIDENCE_THRESHOLD = float(os.getenv("NER_CONFIDENCE_THRESHOLD", "0.85"))
+NER_BACKEND = os.getenv("NER_BACKEND", "onnx-int8").lower()  # Options: "onnx-int8", "fp32"
+if NER_BACKEND not in ["onnx-int8", "fp32"]:
+    raise ValueError(f"Invalid NER_BACKEND: {NER_BACKEND}. Must be 'onnx-int8' or 'fp32'")
 
 # Local Model Cache Configuration
 # Store HuggingFace models in project folder instead of user cache
@@ -42,11 +46,19 @@ os.makedirs(MODELS_CACHE_DIR, exist_ok=True)
 # Vector Database Configuration (for RAG)
 VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "./data/vector_db")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "onnx-int8").lower()  # Options: "onnx-int8", "fp32"
+if EMBEDDING_BACKEND not in ["onnx-int8", "fp32"]:
+    raise ValueError(f"Invalid EMBEDDING_BACKEND: {EMBEDDING_BACKEND}. Must be 'onnx-int8' or 'fp32'")
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
 TOP_K_RESULTS = int(os.getenv("TOP_K_RESULTS", "5"))
 
 # ---------------- Web API Configuration ----------------
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
 API_PORT = int(os.getenv("API_PORT", "8000"))  # .env sets 8002; this cast will pick that up
+# uvloop + httptools ship with uvicorn[standard]; uvloop has no Windows build, so fall back there.
+# One worker only: each would load its own LLM and keep separate in-memory jobs/caches.
+API_LOOP = os.getenv("API_LOOP", "uvloop" if find_spec("uvloop") else "asyncio")
+API_HTTP = os.getenv("API_HTTP", "httptools" if find_spec("httptools") else "h11")
 API_TITLE = "Entity Extraction API"
 API_VERSION = "1.0.0"
 
@@ -57,6 +69,25 @@ LOG_FILE = "./logs/app.log"
 # ---------------- Performance Configuration ----------------
 RESPONSE_TIMEOUT = 120  # seconds for LLM classification
 MAX_CONCURRENT_REQUESTS = 10
+# Intra-op threads for the ONNX embedding session; concurrent calls share its pool
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", max(1, (os.cpu_count() or 1) // 2)))
+# Intra-op threads for the NER forward pass (one document at a time, so all cores)
+NER_THREADS = int(os.getenv("NER_THREADS", os.cpu_count() or 1))
+# llama.cpp runs one generation at a time, so it gets its own larger budget
+LLM_THREADS = int(os.getenv("LLM_THREADS", "4"))
+# Layers offloaded to the GPU (-1 = all); CPU-only llama.cpp builds ignore it
+LLM_GPU_LAYERS = int(os.getenv("LLM_GPU_LAYERS", "-1"))
+# Prompt tokens evaluated per llama.cpp decode call (capped at the 256-token context)
+LLM_N_BATCH = int(os.getenv("LLM_N_BATCH", "256"))
+# Flash attention; also lets the KV cache be stored as q8_0 (half the bandwidth of f16)
+LLM_FLASH_ATTN = os.getenv("LLM_FLASH_ATTN", "true").lower() == "true"
+# Prompt-lookup speculative decoding: tokens drafted per step (0 disables)
+LLM_DRAFT_TOKENS = int(os.getenv("LLM_DRAFT_TOKENS", "8"))
+# Concurrent fact-extraction prompts arriving within this window share one LLM dispatch
+LLM_BATCH_MAX = int(os.getenv("LLM_BATCH_MAX", "8"))
+LLM_BATCH_WAIT_MS = float(os.getenv("LLM_BATCH_WAIT_MS", "20"))
+# Entities whose fact prompts are in flight at once within one extraction job
+FACT_CONCURRENCY = int(os.getenv("FACT_CONCURRENCY", "4"))
 
 
 # Export directory (where we write the final response JSON)
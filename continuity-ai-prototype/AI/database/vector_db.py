@@ -1,40 +1,72 @@
 """Vector database interface for storing and retrieving embeddings."""
+import asyncio
 import logging
 import os
-from typing import List, Dict, Any, Tuple
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import List, Dict, Any, Tuple, Optional
+import numpy as np
 import chromadb
-from models.embedder import Embedder
+from chromadb.api import ClientAPI
+from models.embedder import Embedder, get_embedder
 from config.settings import (
     VECTOR_DB_PATH,
     EMBEDDING_MODEL,
     TOP_K_RESULTS,
+    MAX_CONCURRENT_REQUESTS,
 )
 
 logger = logging.getLogger(__name__)
 
+# Documents embedded and written per batch in add_documents
+ADD_BATCH_SIZE = 64
+
+# Max number of distinct query embeddings kept by VectorDB.search
+QUERY_CACHE_SIZE = 4096
+
+# One client per process; every collection shares the same on-disk handle
+_CLIENT: Optional[ClientAPI] = None
+
+
+def _get_client() -> ClientAPI:
+    """Return the process-wide ChromaDB client, creating it on first use."""
+    global _CLIENT
+    if _CLIENT is None:
+        os.makedirs(VECTOR_DB_PATH, exist_ok=True)
+        _CLIENT = chromadb.PersistentClient(path=VECTOR_DB_PATH)
+    return _CLIENT
+
 
 class VectorDB:
     """Manages vector database operations using ChromaDB."""
 
-    def __init__(self, collection_name: str = "documents"):
+    def __init__(self, collection_name: str = "documents", embedder: Optional[Embedder] = None):
         """
         Initialize vector database.
 
         Args:
             collection_name: Name of the collection to use
+            embedder: Embedder to share; defaults to the process-wide one
         """
-        os.makedirs(VECTOR_DB_PATH, exist_ok=True)
-        
         # Use new ChromaDB API (0.5.x)
-        self.client = chromadb.PersistentClient(
-            path=VECTOR_DB_PATH,
-        )
-        
+        self.client = _get_client()
+
+        # Embeddings are unit-length, so inner product ranks exactly like cosine
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
-            metadata={"hnsw:space": "cosine"},
+            metadata={"hnsw:space": "ip"},
+        )
+        self.embedder = embedder or get_embedder(EMBEDDING_MODEL)
+        # Normalized query -> float32 embedding, in LRU order (oldest first)
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        # Blocking Chroma/embedding calls from async callers run here, never on the loop
+        self._pool = ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_REQUESTS,
+            thread_name_prefix="chroma",
         )
-        self.embedder = Embedder(EMBEDDING_MODEL)
         logger.info(f"VectorDB initialized with collection: {collection_name}")
 
     def add_documents(
@@ -52,22 +84,82 @@ class VectorDB:
             ids: List of document IDs
         """
         try:
-            embeddings = self.embedder.embed_batch(documents)
-            
-            if metadata is None:
-                metadata = [{} for _ in documents]
-            
-            self.collection.add(
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadata,
-                ids=ids or [f"doc_{i}" for i in range(len(documents))],
+            metadata, ids = self._prepare_documents(documents, metadata, ids)
+            for start in range(0, len(documents), ADD_BATCH_SIZE):
+                end = start + ADD_BATCH_SIZE
+                self._add_batch(documents[start:end], metadata[start:end], ids[start:end])
+            logger.info(f"Added {len(documents)} documents to vector DB")
+        except Exception as e:
+            logger.error(f"Error adding documents: {e}")
+            raise
+
+    async def add_documents_async(
+        self,
+        documents: List[str],
+        metadata: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ) -> None:
+        """
+        Add documents to the vector database without blocking the event loop.
+
+        Batches are embedded and written on the worker pool, with at most two
+        in flight so one can embed while the other is written to the index.
+
+        Args:
+            documents: List of document texts
+            metadata: List of metadata dicts (one per document)
+            ids: List of document IDs
+        """
+        try:
+            metadata, ids = self._prepare_documents(documents, metadata, ids)
+            semaphore = asyncio.Semaphore(2)
+
+            async def _add_batch(start: int) -> None:
+                end = start + ADD_BATCH_SIZE
+                async with semaphore:
+                    chunk = documents[start:end]
+                    embeddings = await self._in_pool(self.embedder.embed_batch, chunk)
+                    await self._in_pool(
+                        self.collection.add,
+                        documents=chunk,
+                        embeddings=embeddings,
+                        metadatas=metadata[start:end],
+                        ids=ids[start:end],
+                    )
+
+            await asyncio.gather(
+                *(_add_batch(start) for start in range(0, len(documents), ADD_BATCH_SIZE))
             )
             logger.info(f"Added {len(documents)} documents to vector DB")
         except Exception as e:
             logger.error(f"Error adding documents: {e}")
             raise
 
+    @staticmethod
+    def _prepare_documents(
+        documents: List[str],
+        metadata: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Fill in default metadata and IDs for a list of documents."""
+        if metadata is None:
+            metadata = [{} for _ in documents]
+        return metadata, ids or [f"doc_{i}" for i in range(len(documents))]
+
+    def _add_batch(
+        self,
+        documents: List[str],
+        metadata: List[Dict[str, Any]],
+        ids: List[str],
+    ) -> None:
+        """Embed one batch of documents and write it to the collection."""
+        self.collection.add(
+            documents=documents,
+            embeddings=self.embedder.embed_batch(documents),
+            metadatas=metadata,
+            ids=ids,
+        )
+
     def upsert_documents(
         self,
         documents: List[str],
@@ -98,12 +190,12 @@ class VectorDB:
             List of dicts with 'text', 'metadata', 'distance', and 'id'
         """
         try:
-            query_embedding = self.embedder.embed_text(query)
-            
+            query_embedding = self._embed_query(query)
+
             results = self.collection.query(
-                query_embeddings=[query_embedding.tolist()],
+                query_embeddings=query_embedding.reshape(1, -1),
                 n_results=top_k,
-                include=["embeddings", "distances", "documents", "metadatas"],
+                include=["distances", "documents", "metadatas"],
             )
             
             # Format results
@@ -122,6 +214,42 @@ class VectorDB:
             logger.error(f"Error searching vector DB: {e}")
             raise
 
+    async def search_async(self, query: str, top_k: int = TOP_K_RESULTS) -> List[Dict[str, Any]]:
+        """Search for documents similar to query on the worker pool."""
+        return await self._in_pool(self.search, query, top_k)
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a search query, reusing the cached vector for repeat queries.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Contiguous float32 embedding (1D), passed to ChromaDB without list conversion
+        """
+        # Only the key is normalized: the model embeds the query as given, and case is
+        # kept in the key so a cased model never gets another casing's vector back
+        key = query.strip()
+        with self._query_cache_lock:
+            cached = self._query_cache.get(key)
+            if cached is not None:
+                self._query_cache.move_to_end(key)
+                return cached
+
+        embedding = self.embedder.embed_text(query)
+        with self._query_cache_lock:
+            self._query_cache[key] = embedding
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return embedding
+
+    def clear_query_cache(self) -> None:
+        """Drop all cached query embeddings."""
+        with self._query_cache_lock:
+            self._query_cache.clear()
+        logger.debug("Query embedding cache cleared")
+
     def delete_documents(self, ids: List[str]) -> None:
         """Delete documents by ID."""
         try:
@@ -144,15 +272,61 @@ class VectorDB:
             logger.error(f"Error getting collection info: {e}")
             raise
 
-    def clear_collection(self) -> None:
-        """Clear all documents from collection."""
+    def clear_collection(self, hard: bool = False) -> None:
+        """
+        Clear all documents from collection.
+
+        Args:
+            hard: Drop and recreate the collection (rebuilding its on-disk index)
+                instead of deleting the documents in place
+        """
         try:
-            self.client.delete_collection(name=self.collection.name)
-            self.collection = self.client.get_or_create_collection(
-                name=self.collection.name,
-                metadata={"hnsw:space": "cosine"},
-            )
-            logger.info("Collection cleared")
+            if hard:
+                self.client.delete_collection(name=self.collection.name)
+                self.collection = self.client.get_or_create_collection(
+                    name=self.collection.name,
+                    metadata={"hnsw:space": "ip"},
+                )
+            else:
+                ids = self.collection.get(include=[])["ids"]
+                batch_size = self.client.get_max_batch_size()
+                for start in range(0, len(ids), batch_size):
+                    self.collection.delete(ids=ids[start:start + batch_size])
+            logger.info(f"Collection cleared ({'hard' if hard else 'in place'})")
         except Exception as e:
             logger.error(f"Error clearing collection: {e}")
             raise
+
+    async def delete_documents_async(self, ids: List[str]) -> None:
+        """Delete documents by ID on the worker pool."""
+        await self._in_pool(self.delete_documents, ids)
+
+    async def get_collection_info_async(self) -> Dict[str, Any]:
+        """Get information about the collection on the worker pool."""
+        return await self._in_pool(self.get_collection_info)
+
+    async def clear_collection_async(self, hard: bool = False) -> None:
+        """Clear all documents from collection on the worker pool."""
+        await self._in_pool(self.clear_collection, hard)
+
+    async def _in_pool(self, func, *args, **kwargs):
+        """Run a blocking call on the worker pool and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, partial(func, *args, **kwargs))
+
+
+@lru_cache(maxsize=None)
+def get_vector_db(collection_name: str = "documents") -> VectorDB:
+    """
+    Get the shared VectorDB for a collection.
+
+    The first call loads the embedder and opens the collection; later calls
+    return the same instance so the model and index are only loaded once.
+
+    Args:
+        collection_name: Name of the collection to use
+
+    Returns:
+        Cached VectorDB instance
+    """
+    return VectorDB(collection_name)
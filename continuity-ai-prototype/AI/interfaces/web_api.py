@@ -1,13 +1,16 @@
 import asyncio
-import json
+import secrets
 import time
 import uuid
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 import logging
 
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from models.ner_extractor import HybridNERExtractor
@@ -59,12 +62,19 @@ JOBS: Dict[str, Dict[str, Any]] = {}
 # }
 
 # ---------------- App factory ----------------
+# Keyed by extractor/db identity: building the app again for the same components
+# (e.g. a second entry point in one process) reuses the routes and OpenAPI schema
+@lru_cache(maxsize=4)
 def create_app(
     ner_extractor: HybridNERExtractor,
     fact_extractor: Optional[FactExtractor] = None,
     vector_db: Optional[VectorDB] = None,
 ) -> FastAPI:
-    app = FastAPI(title="Entity Extraction API", version="1.2.0")
+    app = FastAPI(
+        title="Entity Extraction API",
+        version="1.2.0",
+        default_response_class=ORJSONResponse,
+    )
 
     app.add_middleware(
         CORSMiddleware,
@@ -74,9 +84,17 @@ def create_app(
         allow_headers=["*"],
     )
 
+    # Static model metadata, computed once so /health stays a dict lookup
+    app.state.entity_types = ner_extractor.get_supported_entity_types()
+    app.state.model_name = ner_extractor.model_name
+
     @app.get("/health")
     async def health() -> Dict[str, Any]:
-        return {"status": "ok"}
+        return {
+            "status": "ok",
+            "model": app.state.model_name,
+            "entityTypes": app.state.entity_types,
+        }
     
     # ---------- New: async job with progress ----------
     @app.post("/entities/extract/start")
@@ -158,7 +176,7 @@ def create_app(
         all_ids = sorted(set(approved_ids + rejected_ids))
         if all_ids:
             try:
-                vector_db.delete_documents(all_ids)
+                await vector_db.delete_documents_async(all_ids)
             except Exception:
                 logger.debug("Delete step skipped or partial during canon sync", exc_info=True)
 
@@ -177,7 +195,7 @@ def create_app(
             ]
             ids = [f"fact_{f.id}" for f in req.approved_facts if f.fact]
             try:
-                vector_db.add_documents(documents=docs, metadata=metadata, ids=ids)
+                await vector_db.add_documents_async(documents=docs, metadata=metadata, ids=ids)
             except Exception as ex:
                 logger.error("Canon sync add failed: %s", ex, exc_info=True)
                 raise HTTPException(status_code=500, detail=f"Canon sync failed: {type(ex).__name__}")
@@ -193,6 +211,21 @@ def create_app(
 
 
 # ---------------- Job runner ----------------
+@lru_cache(maxsize=1)
+def _export_stamp(second: int) -> str:
+    # localtime/strftime once per wall-clock second, not once per export
+    return time.strftime("%Y%m%d-%H%M%S", time.localtime(second))
+
+
+def _export_path() -> Path:
+    return Path(EXPORT_JSON_DIR) / f"extract_{_export_stamp(int(time.time()))}_{secrets.token_hex(4)}.json"
+
+
+def _write_export(payload: Dict[str, Any], out_path: Path) -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+
+
 async def _run_job(
     job_id: str,
     req: ExtractRequest,
@@ -200,6 +233,7 @@ async def _run_job(
     fact_extractor: Optional[FactExtractor],
 ):
     job = JOBS[job_id]
+    sentences_task: Optional[asyncio.Task] = None
     try:
         job["status"] = "running"
         job["phase"] = "ner"
@@ -209,6 +243,9 @@ async def _run_job(
         text = (req.text or "").strip()
         time_id = req.time_id or "t_001"
 
+        # Sentence prep doesn't depend on entities, so it overlaps with triage/NER
+        sentences_task = asyncio.create_task(fact_extractor.prewarm(text)) if fact_extractor else None
+
         def _triage_progress_cb(info: Dict[str, Any]):
             processed = int(info.get("processed", 0))
             total = max(1, int(info.get("total", 1)))
@@ -229,6 +266,7 @@ async def _run_job(
                 entities=canon_entities,
                 time_id=time_id,
                 progress=_triage_progress_cb,
+                sentences=await sentences_task,
             )
             if not entities:
                 job["message"] = "No canonical matches found; falling back to NER…"
@@ -260,7 +298,7 @@ async def _run_job(
                 job["currentEntityName"] = info.get("entityName")
 
             facts_map = await fact_extractor.extract_facts_for_entities(
-                text, entities, time_id, progress=_progress_cb
+                text, entities, time_id, progress=_progress_cb, sentences=await sentences_task
             )
         else:
             job["phase"] = "finalize"
@@ -272,12 +310,9 @@ async def _run_job(
         payload: Dict[str, Any] = {"entities": entities, "count": len(entities)}
         # export response JSON
         try:
-            ts = time.strftime("%Y%m%d-%H%M%S")
-            rid = uuid.uuid4().hex[:8]
-            out_path = Path(EXPORT_JSON_DIR) / f"extract_{ts}_{rid}.json"
-            out_path.parent.mkdir(parents=True, exist_ok=True)
-            with out_path.open("w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
+            out_path = _export_path()
+            # serialize + write off the event loop; the job only reports done once it's on disk
+            await asyncio.to_thread(_write_export, payload, out_path)
             payload["exportPath"] = str(out_path)
         except Exception as ex:
             print(f"[export] Failed to write JSON: {ex}")
@@ -292,4 +327,12 @@ async def _run_job(
         job["status"] = "error"
         job["message"] = f"{type(e).__name__}: {e}"
         job["phase"] = "finalize"
-        job["progress"] = 1.0
\ No newline at end of file
+        job["progress"] = 1.0
+    finally:
+        # Skipped when no entities were found (or on error): don't leave it running
+        # or its failure unretrieved
+        if sentences_task is not None:
+            if not sentences_task.done():
+                sentences_task.cancel()
+            elif not sentences_task.cancelled():
+                sentences_task.exception()
\ No newline at end of file
@@ -1,35 +1,88 @@
 # embedder.py
 import logging
+from functools import lru_cache
 from typing import List
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
-from config.settings import EMBEDDING_MODEL, MODELS_CACHE_DIR
+from config.settings import (
+    EMBEDDING_MODEL,
+    EMBEDDING_BACKEND,
+    EMBEDDING_ONNX_FILE,
+    MODELS_CACHE_DIR,
+    EMBED_THREADS,
+)
 
 logger = logging.getLogger(__name__)
 
+# Texts per forward pass in embed_batch; matches VectorDB.ADD_BATCH_SIZE so each
+# add batch is a single forward
+EMBED_BATCH_SIZE = 64
+
 
 class Embedder:
     """SentenceTransformer-based text embedding."""
 
-    def __init__(self, model_name: str = EMBEDDING_MODEL):
-        logger.info("Loading embedding model: %s (cache: %s)", model_name, MODELS_CACHE_DIR)
-        self.model = SentenceTransformer(model_name, cache_folder=MODELS_CACHE_DIR)
+    def __init__(self, model_name: str = EMBEDDING_MODEL, backend: str = EMBEDDING_BACKEND):
+        logger.info(
+            "Loading embedding model: %s (backend: %s, cache: %s)", model_name, backend, MODELS_CACHE_DIR
+        )
+        self.backend = backend
+
+        if self.backend == "onnx-int8":
+            # Dynamic int8 export: tokenization, pooling and normalization stay in SentenceTransformer
+            try:
+                import onnxruntime as ort
+
+                # Thread cap is per session, so it leaves torch (NER, fp32 fallback) untouched
+                session_options = ort.SessionOptions()
+                session_options.intra_op_num_threads = EMBED_THREADS
+                self.model = SentenceTransformer(
+                    model_name,
+                    cache_folder=MODELS_CACHE_DIR,
+                    backend="onnx",
+                    model_kwargs={"file_name": EMBEDDING_ONNX_FILE, "session_options": session_options},
+                )
+            except Exception as e:
+                # Missing optimum/onnxruntime or model file: keep serving with FP32
+                logger.warning("ONNX int8 embedder unavailable (%s); falling back to FP32", e)
+                self.backend = "fp32"
+
+        if self.backend == "fp32":
+            self.model = SentenceTransformer(model_name, cache_folder=MODELS_CACHE_DIR)
+            if torch.cuda.is_available():
+                # Inference only: FP16 roughly doubles GPU throughput at negligible quality cost
+                self.model.half()
+                logger.info("Embedding model cast to FP16 on CUDA")
         logger.info("Embedding model loaded from cache")
 
     def embed_text(self, text: str) -> np.ndarray:
         try:
-            return self.model.encode(text, convert_to_tensor=False)
+            return self.model.encode(
+                text, convert_to_tensor=False, normalize_embeddings=True
+            ).astype(np.float32, copy=False)
         except Exception as e:
             logger.error("Error embedding text: %s", e)
             raise
 
-    def embed_batch(self, texts: List[str]) -> List[np.ndarray]:
+    def embed_batch(self, texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
         try:
-            embeddings = self.model.encode(texts, convert_to_tensor=False)
-            return embeddings.tolist()
+            return self.model.encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            ).astype(np.float32, copy=False)
         except Exception as e:
             logger.error("Error batch embedding: %s", e)
             raise
 
     def get_embedding_dimension(self) -> int:
-        return self.model.get_sentence_embedding_dimension()
\ No newline at end of file
+        return self.model.get_sentence_embedding_dimension()
+
+
+@lru_cache(maxsize=None)
+def get_embedder(model_name: str = EMBEDDING_MODEL, backend: str = EMBEDDING_BACKEND) -> Embedder:
+    """Shared Embedder per model, so every VectorDB reuses one loaded model."""
+    return Embedder(model_name, backend)
@@ -1,15 +1,112 @@
 from __future__ import annotations
+import asyncio
+import hashlib
 import re
-import json
 import logging
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Tuple, Callable
 
+import numpy as np
+import orjson
+
+from config.settings import FACT_CONCURRENCY
 from models.extraction_schema import DEFAULT_SCHEMA_VERSION, normalize_aliases, schema_for_entity
+from utils.micro_batcher import MicroBatcher
 
 logger = logging.getLogger(__name__)
 
+try:
+    # One automaton over every entity's surface forms finds candidate sentences in a
+    # single pass; without it each entity's regex scans all sentences
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 Sentence = Tuple[int, int, str]  # (start, end, sentence_text)
 
+# A run ending in . ! ? (or the unterminated tail), without surrounding whitespace
+_SENTENCE_RE = re.compile(r"\s*([^.!?]*[.!?]|[^.!?]*[^.!?\s](?=\s*$))")
+
+# Rules fallback / triage heuristics, compiled once instead of per clause
+_WHITESPACE_RE = re.compile(r"\s+")
+_CLAUSE_SPLIT_RE = re.compile(
+    r"\s*(?:,|;| and | but | while | who | that | which | because | as | with )\s*", re.IGNORECASE
+)
+_CLAUSE_MARKER_RE = re.compile(r"\b(and|but|while|who|that|because|with|which)\b")
+_PREPOSITION_RE = re.compile(r"\b(with|of|through|along|into|over|under|across|before|after)\b")
+_QUALIFIER_RE = re.compile(r"\bwith\b.+\bof\b")
+_PRONOUN_RE = re.compile(r"\b(she|her|hers|he|him|his)\b")
+_LOCATION_FEATURE_RE = re.compile(
+    r"\b(window|windows|booth|ticket|hall|halls|platform|wall|walls|door|doors|dusty|peeling|old)\b"
+)
+_VERB_WORDS = frozenset({
+    "is", "was", "were", "are", "has", "had", "have", "been",
+    "became", "served", "worked", "lived", "died", "born", "held",
+    "led", "said", "asked", "replied", "felt", "knew", "waited", "moved",
+    "smiled", "sounded", "caught", "traced",
+})
+
+# Typographic quotes the model sometimes emits, mapped to their JSON/ASCII forms
+_QUOTE_FIXES = str.maketrans({"“": '"', "”": '"', "’": "'", "‛": "'"})
+
+# Max number of parsed LLM fact replies kept, keyed by a digest of the full prompt
+FACTS_CACHE_SIZE = 4096
+
+# Constant part of every fact prompt, built once. It comes first and the per-call
+# fields last: llama.cpp keeps the KV cache of the longest token prefix shared with
+# the previous call, so only the short tail is prefilled
+_FACT_PROMPT_HEAD = (
+    "You extract facts strictly from the given sentence about the target entity.\n"
+    'Return JSON ONLY with EXACTLY this schema:\n{"facts": ["<fact-1>", "<fact-2>"]}\n'
+    "Rules:\n"
+    "- Include 0–3 facts explicitly supported by THIS sentence.\n"
+    "- Atomic means one subject-predicate claim per fact.\n"
+    "- Do not combine action + motivation + description in one fact.\n"
+    "- Split conjunctions into separate facts when possible.\n"
+    "- No external knowledge.\n"
+    "- Use DOUBLE quotes. Do NOT use single quotes.\n"
+    "- Do NOT include markdown/code fences or any extra text.\n"
+    '- If no facts, return {"facts": []} exactly.\n'
+    'Example good output: {"facts": ["Alice has green eyes.", "Alice is in an old train station."]}\n'
+    'Example bad output: {"facts": ["Alice moved through the station with quiet confidence while waiting for a sign."]}\n\n'
+)
+
+# Most facts one reply can carry (FACTS_GRAMMAR below allows three)
+FACTS_PER_REPLY = 3
+
+# GBNF for the fact prompt's reply: {"facts": [...]} with at most three strings,
+# so decoding can't spend tokens on fences/prose and always ends in parseable JSON.
+# Once "]}" is emitted the grammar only admits EOS, so generation stops right there;
+# max_tokens just needs to cover three short facts (~96 tokens)
+FACTS_GRAMMAR = r'''
+root ::= "{\"facts\": [" ( fact ( ", " fact )? ( ", " fact )? )? "]}"
+fact ::= "\"" char+ "\""
+char ::= [^"\\\x00-\x1f] | "\\" ["\\/bfnrt]
+'''
+
+
+def _name_surfaces(name: str, aliases: Tuple[str, ...]) -> List[str]:
+    """Literal forms an entity's name pattern matches (before the possessive)."""
+    parts = [p for p in re.split(r"\s+", name.strip()) if p]
+    surfaces = [name]
+    if len(parts) >= 2:
+        surfaces.append(parts[-1])  # surname
+    for a in aliases:
+        if a and a.lower() != name.lower():
+            surfaces.append(a)
+    return surfaces
+
+
+@lru_cache(maxsize=1024)
+def _compile_name_pattern(name: str, aliases: Tuple[str, ...]) -> "re.Pattern[str]":
+    # One compile per distinct (name, aliases): callers ask again per document and per sentence
+    variants = [re.escape(surface) for surface in _name_surfaces(name, aliases)]
+    possessive = r"(?:'s|’s)?"
+    pattern = rf"\b(?:{'|'.join(variants)}){possessive}\b"
+    return re.compile(pattern, re.IGNORECASE)
+
+
 class FactExtractor:
     def __init__(
         self,
@@ -18,9 +115,10 @@ class FactExtractor:
         max_facts_per_entity: int = 3,
         rules_fallback: bool = False,
         temperature: float = 0.2,
-        max_tokens: int = 160,
+        max_tokens: int = 96,
         auto_validate_facts: bool = False,
         fact_validator=None,
+        concurrency: int = FACT_CONCURRENCY,
     ):
         self.llm = llm
         self.use_llm = use_llm
@@ -30,6 +128,14 @@ class FactExtractor:
         self.max_tokens = max_tokens
         self.auto_validate_facts = auto_validate_facts
         self.fact_validator = fact_validator
+        self.concurrency = max(1, concurrency)
+        self._facts_cache: "OrderedDict[bytes, Tuple[str, ...]]" = OrderedDict()
+        # Concurrent extraction jobs share LLM dispatches when the manager supports it
+        self._batcher = (
+            MicroBatcher(self._generate_json_batch)
+            if hasattr(llm, "generate_json_batch")
+            else None
+        )
 
         # Lazy load fact validator if needed
         if self.fact_validator is None:
@@ -48,6 +154,7 @@ class FactExtractor:
         entities: List[dict],
         time_id: str,
         progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        sentences: Optional[List[Sentence]] = None,
     ) -> Dict[str, List[dict]]:
         """Extract facts per entity.
 
@@ -56,10 +163,12 @@ class FactExtractor:
             entities: List of entity dicts that include at least {id, name, aliases?}.
             time_id: Timestamp/tag propagated to evidence.
             progress: Optional callback receiving {processed, total, entityId, entityName}.
+            sentences: Sentence spans from prewarm(); split here when omitted.
         Returns:
             Mapping from entity id -> list of fact dicts.
         """
-        sentences = self._split_sentences_with_spans(text)
+        if sentences is None:
+            sentences = self._split_sentences_with_spans(text)
         results: Dict[str, List[dict]] = {}
 
         total = max(1, len(entities))
@@ -70,36 +179,86 @@ class FactExtractor:
             except Exception:  # don't let UI break the pipeline
                 logger.debug("progress callback failed at start", exc_info=True)
 
-        for ent in entities:
+        named = [ent for ent in entities if (ent.get("name") or "").strip() and ent.get("id")]
+        candidates = self._mention_candidates(
+            [(ent["name"].strip(), normalize_aliases(ent["name"].strip(), ent.get("aliases") or [])) for ent in named],
+            sentences,
+        )
+        candidates_by_ent = dict(zip(map(id, named), candidates)) if candidates is not None else {}
+
+        # Entities are independent, so their LLM prompts overlap (and coalesce in the
+        # micro-batcher); the semaphore keeps the executor queue bounded
+        sem = asyncio.Semaphore(self.concurrency)
+
+        def _report(ent_id: Any, name: str) -> None:
+            nonlocal processed
+            processed += 1
+            if progress:
+                try:
+                    progress({
+                        "processed": processed,
+                        "total": total,
+                        "entityId": ent_id,
+                        "entityName": name,
+                    })
+                except Exception:
+                    logger.debug("progress callback failed (per-entity)", exc_info=True)
+
+        async def _one(ent: dict) -> Optional[List[dict]]:
             name = (ent.get("name") or "").strip()
             ent_id = ent.get("id")
             if not name or not ent_id:
-                processed += 1
-                if progress:
-                    try:
-                        progress({"processed": processed, "total": total, "entityId": ent_id, "entityName": name})
-                    except Exception:
-                        logger.debug("progress callback failed (skip entity)", exc_info=True)
-                continue
+                _report(ent_id, name)
+                return None
+            async with sem:
+                entity_facts = await self._extract_facts_for_entity(
+                    ent, name, sentences, time_id, candidates_by_ent.get(id(ent))
+                )
+            _report(ent_id, name)
+            return entity_facts
 
-            entity_type = (ent.get("entityType") or ent.get("type") or "concept")
-            if not isinstance(entity_type, str):
-                entity_type = "concept"
-            schema = ent.get("schema") if isinstance(ent.get("schema"), dict) else schema_for_entity(entity_type)
-            schema_version = str(ent.get("schema_version") or schema.get("schema_version") or DEFAULT_SCHEMA_VERSION)
-            aliases = normalize_aliases(name, ent.get("aliases") or [])
-            mention_sents = self._find_mention_sentences(name, sentences, aliases, entity_type=entity_type)
-            logger.debug("Fact extraction: entity='%s' mentions=%d", name, len(mention_sents))
+        per_entity = await asyncio.gather(*(_one(ent) for ent in entities))
+        for ent, entity_facts in zip(entities, per_entity):
+            if entity_facts is not None:
+                results[ent["id"]] = entity_facts
 
-            facts: List[dict] = []
-            for start, end, sent_text in mention_sents:
-                llm_facts = await self._llm_extract_facts_for_sentence(
-                    name,
-                    sent_text,
-                    entity_type=entity_type,
-                    schema_version=schema_version,
-                    atomic_only=bool(schema.get("atomic_facts_only", True)),
-                )
+        return results
+
+    async def _extract_facts_for_entity(
+        self,
+        ent: dict,
+        name: str,
+        sentences: List[Sentence],
+        time_id: str,
+        candidate_idxs: Optional[List[int]] = None,
+    ) -> List[dict]:
+        entity_type = (ent.get("entityType") or ent.get("type") or "concept")
+        if not isinstance(entity_type, str):
+            entity_type = "concept"
+        schema = ent.get("schema") if isinstance(ent.get("schema"), dict) else schema_for_entity(entity_type)
+        schema_version = str(ent.get("schema_version") or schema.get("schema_version") or DEFAULT_SCHEMA_VERSION)
+        aliases = normalize_aliases(name, ent.get("aliases") or [])
+        mention_sents = self._find_mention_sentences(
+            name, sentences, aliases, entity_type=entity_type, candidate_idxs=candidate_idxs
+        )
+        logger.debug("Fact extraction: entity='%s' mentions=%d", name, len(mention_sents))
+
+        facts: List[dict] = []
+        pending = list(mention_sents)
+        while pending and len(facts) < self.max_facts_per_entity:
+            # Prompt just enough sentences to fill the cap if each reply is full, in one
+            # batched dispatch; llama.cpp decodes them back to back, so no extras
+            missing = self.max_facts_per_entity - len(facts)
+            window = pending[: -(-missing // FACTS_PER_REPLY)]
+            pending = pending[len(window):]
+            window_facts = await self._llm_extract_facts_for_sentences(
+                name,
+                [sent_text for _, _, sent_text in window],
+                entity_type=entity_type,
+                schema_version=schema_version,
+                atomic_only=bool(schema.get("atomic_facts_only", True)),
+            )
+            for (start, end, sent_text), llm_facts in zip(window, window_facts):
                 logger.debug(
                     "Fact extraction: entity='%s' llm_facts=%d sentence='%s'",
                     name,
@@ -157,39 +316,33 @@ class FactExtractor:
                 if len(facts) >= self.max_facts_per_entity:
                     break
 
-            # de-dup by (fact text + span), then cap
-            uniq, seen = [], set()
-            for f in facts:
-                key = (f["fact"].strip().lower(), f["evidence"]["start"], f["evidence"]["end"])
-                if key not in seen:
-                    uniq.append(f)
-                    seen.add(key)
-
-            # Apply fact validation only if auto-validation is enabled
-            entity_facts = uniq[: self.max_facts_per_entity]
-            logger.debug("Fact extraction: entity='%s' final_facts=%d", name, len(entity_facts))
-            if self.auto_validate_facts and self.fact_validator and len(entity_facts) > 1:
-                try:
-                    entity_facts = self.fact_validator.validate_facts(entity_facts)
-                    logger.debug(f"Auto-validated {len(entity_facts)} facts for entity {name}")
-                except Exception as e:
-                    logger.warning(f"Fact validation failed for entity {name}: {e}")
+        # de-dup by (fact text + span), then cap
+        uniq, seen = [], set()
+        for f in facts:
+            key = (f["fact"].strip().lower(), f["evidence"]["start"], f["evidence"]["end"])
+            if key not in seen:
+                uniq.append(f)
+                seen.add(key)
+
+        # Apply fact validation only if auto-validation is enabled
+        entity_facts = uniq[: self.max_facts_per_entity]
+        logger.debug("Fact extraction: entity='%s' final_facts=%d", name, len(entity_facts))
+        if self.auto_validate_facts and self.fact_validator and len(entity_facts) > 1:
+            try:
+                entity_facts = self.fact_validator.validate_facts(entity_facts)
+                logger.debug(f"Auto-validated {len(entity_facts)} facts for entity {name}")
+            except Exception as e:
+                logger.warning(f"Fact validation failed for entity {name}: {e}")
 
-            results[ent_id] = entity_facts
+        return entity_facts
 
-            processed += 1
-            if progress:
-                try:
-                    progress({
-                        "processed": processed,
-                        "total": total,
-                        "entityId": ent_id,
-                        "entityName": name,
-                    })
-                except Exception:
-                    logger.debug("progress callback failed (per-entity)", exc_info=True)
+    async def prewarm(self, text: str) -> List[Sentence]:
+        """Entity-independent prep (sentence spans), run in a worker thread.
 
-        return results
+        Start this as a task before NER so it overlaps with entity extraction, then
+        pass the result to triage_entities / extract_facts_for_entities.
+        """
+        return await asyncio.to_thread(self._split_sentences_with_spans, text)
 
     async def triage_entities(
         self,
@@ -197,8 +350,10 @@ class FactExtractor:
         entities: List[dict],
         time_id: str,
         progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        sentences: Optional[List[Sentence]] = None,
     ) -> List[dict]:
-        sentences = self._split_sentences_with_spans(text)
+        if sentences is None:
+            sentences = self._split_sentences_with_spans(text)
         total = max(1, len(entities))
         processed = 0
         triaged: List[dict] = []
@@ -286,43 +441,93 @@ class FactExtractor:
         return validated_entities
 
     # ---------------- LLM extraction ----------------
-    async def _llm_extract_facts_for_sentence(
+    async def _llm_extract_facts_for_sentences(
         self,
         name: str,
-        sentence: str,
+        sentences: List[str],
         entity_type: str = "concept",
         schema_version: str = DEFAULT_SCHEMA_VERSION,
         atomic_only: bool = True,
-    ) -> List[str]:
-        if not self.llm or not self.use_llm:
-            return []
-        prompt = (
-            "You extract facts strictly from the given sentence.\n"
-            f"Target entity: {name}\n"
-            f"Entity type: {entity_type}\n"
+    ) -> List[List[str]]:
+        """Facts per sentence, with all of the sentences' prompts dispatched together.
+
+        Through the micro-batcher the prompts land in one generate_json_batch call
+        (one lock hold, one executor hop); a failed prompt yields no facts. Parsed
+        replies are cached by prompt, so re-runs of a text skip the LLM entirely.
+        """
+        if not self.llm or not self.use_llm or not sentences:
+            return [[] for _ in sentences]
+        prompts = [
+            self._fact_prompt(name, sentence, entity_type, schema_version, atomic_only)
+            for sentence in sentences
+        ]
+        keys = [hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).digest() for prompt in prompts]
+        results: List[Optional[List[str]]] = [self._cached_facts(key) for key in keys]
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        if not misses:
+            return results  # type: ignore[return-value]
+
+        if self._batcher is not None:
+            texts = await asyncio.gather(
+                *(self._batcher.submit(prompts[i]) for i in misses), return_exceptions=True
+            )
+        else:
+            texts = []
+            for i in misses:
+                try:
+                    texts.append(
+                        await self.llm.generate_json(
+                            prompts[i],
+                            temperature=self.temperature,
+                            max_tokens=self.max_tokens,
+                            grammar=FACTS_GRAMMAR,
+                        )  # type: ignore
+                    )
+                except Exception as e:
+                    texts.append(e)
+
+        for i, text in zip(misses, texts):
+            if isinstance(text, BaseException):
+                logger.error(
+                    "LLM generation failed; returning no facts for sentence",
+                    exc_info=(type(text), text, text.__traceback__),
+                )
+                results[i] = []
+            else:
+                results[i] = self._facts_from_llm_text(text)
+                self._remember_facts(keys[i], results[i])
+        return results  # type: ignore[return-value]
+
+    def _cached_facts(self, key: bytes) -> Optional[List[str]]:
+        cached = self._facts_cache.get(key)
+        if cached is None:
+            return None
+        self._facts_cache.move_to_end(key)
+        return list(cached)
+
+    def _remember_facts(self, key: bytes, facts: List[str]) -> None:
+        self._facts_cache[key] = tuple(facts)
+        if len(self._facts_cache) > FACTS_CACHE_SIZE:
+            self._facts_cache.popitem(last=False)
+
+    def _fact_prompt(
+        self,
+        name: str,
+        sentence: str,
+        entity_type: str,
+        schema_version: str,
+        atomic_only: bool,
+    ) -> str:
+        return (
+            f"{_FACT_PROMPT_HEAD}"
+            f"Return atomic facts only: {str(atomic_only).lower()}\n"
             f"Schema version: {schema_version}\n"
-            'Return JSON ONLY with EXACTLY this schema:\n{"facts": ["<fact-1>", "<fact-2>"]}\n'
-            "Rules:\n"
-            "- Include 0–3 facts explicitly supported by THIS sentence.\n"
-            f"- Return atomic facts only: {str(atomic_only).lower()}.\n"
-            "- Atomic means one subject-predicate claim per fact.\n"
-            "- Do not combine action + motivation + description in one fact.\n"
-            "- Split conjunctions into separate facts when possible.\n"
-            "- No external knowledge.\n"
-            "- Use DOUBLE quotes. Do NOT use single quotes.\n"
-            "- Do NOT include markdown/code fences or any extra text.\n"
-            '- If no facts, return {"facts": []} exactly.\n\n'
-            f"Sentence: {sentence}\n"
-            'Example good output: {"facts": ["Alice has green eyes.", "Alice is in an old train station."]}\n'
-            'Example bad output: {"facts": ["Alice moved through the station with quiet confidence while waiting for a sign."]}'
+            f"Entity type: {entity_type}\n"
+            f"Target entity: {name}\n"
+            f"Sentence: {sentence}"
         )
-        try:
-            text = await self.llm.generate_json(
-                prompt, temperature=self.temperature, max_tokens=self.max_tokens  # type: ignore
-            )
-        except Exception:
-            logger.exception("LLM generation failed; returning no facts for sentence")
-            return []
+
+    def _facts_from_llm_text(self, text: str) -> List[str]:
         data = self._safe_json(text)
         raw_facts = [s.strip() for s in data.get("facts", []) if isinstance(s, str) and s.strip()]
 
@@ -352,38 +557,73 @@ class FactExtractor:
 
         return facts
 
+    async def _generate_json_batch(self, prompts: List[str]) -> List[Any]:
+        return await self.llm.generate_json_batch(  # type: ignore
+            prompts, temperature=self.temperature, max_tokens=self.max_tokens, grammar=FACTS_GRAMMAR
+        )
+
     # ---------------- Helpers ----------------
     def _split_sentences_with_spans(self, text: str) -> List[Sentence]:
         """Very simple sentence splitter that also returns spans.
         It groups characters into chunks ending with . ! ? or end-of-text.
         """
-        sentences: List[Sentence] = []
-        pattern = re.compile(r"[^.!?]*[.!?]|[^.!?]+$")
-        for m in pattern.finditer(text):
-            start = m.start()
-            end = m.end()
-            chunk = text[start:end]
-            # trim leading/trailing whitespace but adjust spans accordingly
-            ltrim = len(chunk) - len(chunk.lstrip())
-            rtrim = len(chunk.rstrip())
-            tstart = start + ltrim
-            tend = start + rtrim
-            chunk = text[tstart:tend]
-            if chunk:
-                sentences.append((tstart, tend, chunk))
-        return sentences
+        # The regex skips the whitespace around each sentence itself, so spans come
+        # straight from the match with no per-chunk strip/slice bookkeeping
+        return [(m.start(1), m.end(1), m.group(1)) for m in _SENTENCE_RE.finditer(text)]
 
     def _name_patterns(self, name: str, aliases: Optional[List[str]] = None):
-        parts = [p for p in re.split(r"\s+", name.strip()) if p]
-        variants = [re.escape(name)]
-        if len(parts) >= 2:
-            variants.append(re.escape(parts[-1]))  # surname
-        for a in (aliases or []):
-            if a and a.lower() != name.lower():
-                variants.append(re.escape(a))
-        possessive = r"(?:'s|’s)?"
-        pattern = rf"\b(?:{'|'.join(variants)}){possessive}\b"
-        return re.compile(pattern, re.IGNORECASE)
+        return _compile_name_pattern(name, tuple(aliases or ()))
+
+    def _mention_candidates(
+        self,
+        names: List[Tuple[str, List[str]]],
+        sentences: List[Sentence],
+    ) -> Optional[List[List[int]]]:
+        """Sentence indexes containing any surface form of each (name, aliases), in one pass.
+
+        A superset of the name pattern's matches (no word-boundary check), so callers
+        still confirm with the regex; None when pyahocorasick isn't installed.
+        """
+        if ahocorasick is None or not names or not sentences:
+            return None
+        owners: Dict[str, List[int]] = {}
+        for i, (name, aliases) in enumerate(names):
+            for surface in _name_surfaces(name, tuple(aliases)):
+                if surface.strip():
+                    owners.setdefault(surface.lower(), []).append(i)
+        if not owners:
+            return None
+        automaton = ahocorasick.Automaton()
+        for surface, idxs in owners.items():
+            automaton.add_word(surface, (len(surface), idxs))
+        automaton.make_automaton()
+
+        # Sentences joined with a separator no surface form contains, so hits never span two
+        starts: List[int] = []
+        pos = 0
+        for _, _, sent_text in sentences:
+            starts.append(pos)
+            pos += len(sent_text) + 1
+        haystack = "\x00".join(sent_text for _, _, sent_text in sentences).lower()
+        if len(haystack) != pos - 1:
+            return None  # lower() changed the length; offsets no longer line up
+
+        hit_starts: List[int] = []
+        hit_owners: List[int] = []
+        for end, (length, idxs) in automaton.iter(haystack):
+            hit_starts.extend([end - length + 1] * len(idxs))
+            hit_owners.extend(idxs)
+        if not hit_owners:
+            return [[] for _ in names]
+
+        # Bucket every hit into its sentence in one searchsorted, then dedupe
+        # (entity, sentence) pairs with one unique over a combined key
+        n_sents = len(sentences)
+        sent_idx = np.searchsorted(np.asarray(starts, dtype=np.int64), hit_starts, side="right") - 1
+        pairs = np.unique(np.asarray(hit_owners, dtype=np.int64) * n_sents + sent_idx)
+        owners, sent_of_pair = np.divmod(pairs, n_sents)
+        bounds = np.searchsorted(owners, np.arange(len(names) + 1))
+        return [sent_of_pair[bounds[i] : bounds[i + 1]].tolist() for i in range(len(names))]
 
     def _find_mention_sentences(
         self,
@@ -391,9 +631,12 @@ class FactExtractor:
         sentences: List[Sentence],
         aliases: Optional[List[str]] = None,
         entity_type: str = "concept",
+        candidate_idxs: Optional[List[int]] = None,
     ) -> List[Sentence]:
         name_re = self._name_patterns(name, aliases)
-        direct_matches = [idx for idx, sentence in enumerate(sentences) if name_re.search(sentence[2])]
+        if candidate_idxs is None:
+            candidate_idxs = range(len(sentences))  # type: ignore[assignment]
+        direct_matches = [idx for idx in candidate_idxs if name_re.search(sentences[idx][2])]
         include_idxs = set(direct_matches)
 
         if entity_type == "character" and direct_matches:
@@ -500,7 +743,8 @@ class FactExtractor:
             return []
 
         # Ensure sentence actually mentions the target entity (or alias/surname).
-        if not self._name_patterns(name, aliases).search(sent_text):
+        name_re = self._name_patterns(name, aliases)
+        if not name_re.search(sent_text):
             return []
 
         candidates = self._decompose_sentence(sent_text)
@@ -509,7 +753,7 @@ class FactExtractor:
             text = clause.strip()
             if not text:
                 continue
-            if not self._name_patterns(name, aliases).search(text):
+            if not name_re.search(text):
                 continue
             if not self._contains_verb(text):
                 continue
@@ -784,42 +1028,31 @@ class FactExtractor:
 
     def _is_character_coref_sentence(self, text: str) -> bool:
         lowered = text.lower()
-        has_pronoun = bool(re.search(r"\b(she|her|hers|he|him|his)\b", lowered))
+        has_pronoun = bool(_PRONOUN_RE.search(lowered))
         return has_pronoun and self._contains_verb(text)
 
     def _is_location_context_sentence(self, text: str) -> bool:
         lowered = text.lower()
-        has_location_feature = bool(
-            re.search(r"\b(window|windows|booth|ticket|hall|halls|platform|wall|walls|door|doors|dusty|peeling|old)\b", lowered)
-        )
+        has_location_feature = bool(_LOCATION_FEATURE_RE.search(lowered))
         return has_location_feature and self._contains_verb(text)
 
     def _contains_verb(self, text: str) -> bool:
-        words = text.lower().split()
-        return any(
-            w in {
-                "is", "was", "were", "are", "has", "had", "have", "been",
-                "became", "served", "worked", "lived", "died", "born", "held",
-                "led", "said", "asked", "replied", "felt", "knew", "waited", "moved",
-                "smiled", "sounded", "caught", "traced",
-            }
-            for w in words
-        )
+        return not _VERB_WORDS.isdisjoint(text.lower().split())
 
     def _decompose_sentence(self, sentence: str) -> List[str]:
-        cleaned = re.sub(r"\s+", " ", sentence).strip()
+        cleaned = _WHITESPACE_RE.sub(" ", sentence).strip()
         if not cleaned:
             return []
-        parts = re.split(r"\s*(?:,|;| and | but | while | who | that | which | because | as | with )\s*", cleaned, flags=re.IGNORECASE)
+        parts = _CLAUSE_SPLIT_RE.split(cleaned)
         return [p.strip(" .") for p in parts if p and p.strip()]
 
     def _atomicity_score(self, text: str) -> float:
         lowered = text.lower()
         tokens = max(1, len(lowered.split()))
-        clause_markers = len(re.findall(r"\b(and|but|while|who|that|because|with|which)\b", lowered))
+        clause_markers = len(_CLAUSE_MARKER_RE.findall(lowered))
         punctuation_breaks = lowered.count(",") + lowered.count(";")
-        preposition_density = len(re.findall(r"\b(with|of|through|along|into|over|under|across|before|after)\b", lowered))
-        qualifier_pattern = 1 if re.search(r"\bwith\b.+\bof\b", lowered) else 0
+        preposition_density = len(_PREPOSITION_RE.findall(lowered))
+        qualifier_pattern = 1 if _QUALIFIER_RE.search(lowered) else 0
         penalty = min(
             0.88,
             0.2 * clause_markers
@@ -846,29 +1079,36 @@ class FactExtractor:
     def _safe_json(self, text: str) -> Dict[str, Any]:
         if not text:
             return {"facts": []}
-        s = text.strip()
+        s = text.strip().translate(_QUOTE_FIXES)
+        # Grammar-constrained replies are already exact JSON: one parse, no fixup ladder
+        if s.startswith("{"):
+            try:
+                data = orjson.loads(s)
+                if isinstance(data, dict):
+                    return data
+            except orjson.JSONDecodeError:
+                pass
         s = s.replace("```json", "```").replace("```JSON", "```")
         if s.startswith("```") and s.endswith("```"):
             s = s.strip("`").strip()
             start, end = s.find("{"), s.rfind("}")
             if start != -1 and end != -1 and end > start:
                 s = s[start : end + 1]
-        s = s.replace("“", '"').replace("”", '"').replace("’", "'").replace("‛", "'")
         try:
-            return json.loads(s)
+            return orjson.loads(s)
         except Exception:
             pass
         # try to coerce common single-quote JSON mistakes
         s2 = re.sub(r"(?P<pre>[\{,\s])'(?P<key>\w+)'(?P<post>\s*:)", r'\g<pre>"\g<key>"\g<post>', s)
         s2 = re.sub(r':\s*\'(.*?)\'', lambda m: ':"{}"'.format(m.group(1).replace('"', '\\"')), s2)
         try:
-            return json.loads(s2)
+            return orjson.loads(s2)
         except Exception:
             pass
         m = re.search(r'\[(?:\s*".*?"\s*)(?:,\s*".*?"\s*)*\]', s)
         if m:
             try:
-                arr = json.loads(m.group(0))
+                arr = orjson.loads(m.group(0))
                 return {"facts": arr}
             except Exception:
                 pass
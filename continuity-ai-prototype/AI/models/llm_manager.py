@@ -1,15 +1,31 @@
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, List, Optional
 
-from llama_cpp import Llama
-from config.settings import MODEL_PATH, RESPONSE_TIMEOUT
+from llama_cpp import GGML_TYPE_F16, GGML_TYPE_Q8_0, Llama, LlamaGrammar
+from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+from config.settings import (
+    MODEL_PATH,
+    RESPONSE_TIMEOUT,
+    LLM_THREADS,
+    LLM_GPU_LAYERS,
+    LLM_N_BATCH,
+    LLM_FLASH_ATTN,
+    LLM_DRAFT_TOKENS,
+)
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _compile_grammar(gbnf: str) -> LlamaGrammar:
+    return LlamaGrammar.from_string(gbnf, verbose=False)
+
+
 class LLMManager:
     """Local LLM manager (llama-cpp)."""
 
@@ -19,18 +35,36 @@ class LLMManager:
             raise FileNotFoundError(f"Model not found: {self.model_path}")
 
         self._lock = asyncio.Lock()
+        # The llama context isn't thread-safe: one dedicated worker keeps every call on
+        # it in order, even one still running after its awaiter timed out
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llama")
+        n_ctx = 256
+        n_batch = max(1, min(LLM_N_BATCH, n_ctx))
+        # A quantized V cache needs flash attention; keep K and V at the same type
+        kv_type = GGML_TYPE_Q8_0 if LLM_FLASH_ATTN else GGML_TYPE_F16
         self.llm = Llama(
             model_path=self.model_path,
-            n_ctx=256,
-            n_threads=4,
-            n_gpu_layers=0,
-            n_batch=4,
-            n_ubatch=4,
+            n_ctx=n_ctx,
+            n_threads=LLM_THREADS,
+            n_gpu_layers=LLM_GPU_LAYERS,
+            n_batch=n_batch,
+            n_ubatch=n_batch,
+            flash_attn=LLM_FLASH_ATTN,
+            offload_kqv=True,
+            type_k=kv_type,
+            type_v=kv_type,
+            # Speculative decoding: facts restate the prompt's sentence, so n-gram
+            # lookup in the prompt drafts tokens that are verified in one pass
+            draft_model=LlamaPromptLookupDecoding(num_pred_tokens=LLM_DRAFT_TOKENS)
+            if LLM_DRAFT_TOKENS > 0
+            else None,
             verbose=False,
             use_mlock=False,
             use_mmap=True,
         )
-        logger.info("LLMManager initialized with model: %s", self.model_path)
+        logger.info(
+            "LLMManager initialized with model: %s (gpu_layers=%d)", self.model_path, LLM_GPU_LAYERS
+        )
 
     def reset_context(self):
         try:
@@ -73,7 +107,7 @@ class LLMManager:
                         tokens.append(t)
                     return "".join(tokens)
                 return await asyncio.wait_for(
-                    loop.run_in_executor(None, _run), timeout=RESPONSE_TIMEOUT
+                    loop.run_in_executor(self._executor, _run), timeout=RESPONSE_TIMEOUT
                 )
         except asyncio.TimeoutError:
             logger.error("LLM response timeout after %ss", RESPONSE_TIMEOUT)
@@ -100,8 +134,12 @@ class LLMManager:
             )
 
         try:
-            stream = await loop.run_in_executor(None, _get_stream)
-            for chunk in stream:
+            stream = await loop.run_in_executor(self._executor, _get_stream)
+            while True:
+                # Each step decodes on the llama context, so it runs on its worker too
+                chunk = await loop.run_in_executor(self._executor, next, stream, None)
+                if chunk is None:
+                    break
                 token = chunk["choices"][0]["text"]
                 if token:
                     yield token
@@ -109,82 +147,129 @@ class LLMManager:
             logger.error("LLM stream error: %s", e)
             raise
 
+    def _generate_json_sync(
+        self, prompt: str, temperature: float, max_tokens: int, grammar: Optional[str] = None
+    ) -> str:
+        start = time.time()
+        logger.info(
+            "LLM JSON start (temp=%.2f, max_tokens=%d, prompt_len=%d)",
+            temperature,
+            max_tokens,
+            len(prompt),
+        )
+        text = ""
+        resp = None
+        # GBNF constrains sampling so only output matching the grammar can be produced
+        llama_grammar = _compile_grammar(grammar) if grammar else None
+
+        # Try chat completion first
+        try:
+            resp = self.llm.create_chat_completion(
+                messages=[
+                    {"role": "system", "content": "You are a precise JSON extractor. Reply only with JSON."},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=temperature,
+                top_p=0.95,
+                max_tokens=max_tokens,
+                stop=[],
+                grammar=llama_grammar,
+            )
+            text = (resp["choices"][0]["message"].get("content") or "").strip()
+        except Exception as chat_err:
+            logger.debug("Chat completion not available: %s", chat_err)
+
+        # Fallback to instruction completion
+        if not text:
+            instr = f"### Instruction:\n{prompt}\n### Response:\n"
+            resp = self.llm(
+                instr,
+                temperature=temperature,
+                top_p=0.95,
+                max_tokens=max_tokens,
+                stop=[],
+                echo=False,
+                grammar=llama_grammar,
+            )
+            text = (resp["choices"][0].get("text") or "").strip()
+
+        dur = time.time() - start
+        logger.info("LLM JSON done in %.2fs; len=%d", dur, len(text))
+
+        if not text:
+            logger.warning(
+                "LLM returned empty text; keys=%s choices=%s",
+                list(resp.keys()) if resp else [],
+                (resp.get("choices") if resp else None),
+            )
+
+        # Trim any think tags if present (HTML-escaped style handled upstream as needed)
+        if "<think>" in text and "</think>" in text:
+            text = text.split("</think>")[-1].strip()
+        if "&lt;think&gt;" in text and "&lt;/think&gt;" in text:
+            text = text.split("&lt;/think&gt;")[-1].strip()
+        return text
+
     async def generate_json(
         self,
         prompt: str,
         temperature: float = 0.7,
         max_tokens: int = 256,
         timeout_seconds: int | None = None,
+        grammar: Optional[str] = None,
     ) -> str:
         loop = asyncio.get_running_loop()
-
-        def _run() -> str:
-            start = time.time()
-            logger.info(
-                "LLM JSON start (temp=%.2f, max_tokens=%d, prompt_len=%d)",
-                temperature,
-                max_tokens,
-                len(prompt),
-            )
-            text = ""
-            resp = None
-
-            # Try chat completion first
-            try:
-                resp = self.llm.create_chat_completion(
-                    messages=[
-                        {"role": "system", "content": "You are a precise JSON extractor. Reply only with JSON."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=temperature,
-                    top_p=0.95,
-                    max_tokens=max_tokens,
-                    stop=[],
-                )
-                text = (resp["choices"][0]["message"].get("content") or "").strip()
-            except Exception as chat_err:
-                logger.debug("Chat completion not available: %s", chat_err)
-
-            # Fallback to instruction completion
-            if not text:
-                instr = f"### Instruction:\n{prompt}\n### Response:\n"
-                resp = self.llm(
-                    instr,
-                    temperature=temperature,
-                    top_p=0.95,
-                    max_tokens=max_tokens,
-                    stop=[],
-                    echo=False,
+        to = timeout_seconds or min(max(RESPONSE_TIMEOUT, 60), 120)
+        try:
+            async with self._lock:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(
+                        self._executor, self._generate_json_sync, prompt, temperature, max_tokens, grammar
+                    ),
+                    timeout=to,
                 )
-                text = (resp["choices"][0].get("text") or "").strip()
+        except asyncio.TimeoutError:
+            logger.error("LLM JSON timeout after %.0fs (prompt len=%d)", to, len(prompt))
+            raise
+        except Exception as e:
+            logger.error("LLM generate_json error: %s", e)
+            raise
 
-            dur = time.time() - start
-            logger.info("LLM JSON done in %.2fs; len=%d", dur, len(text))
+    async def generate_json_batch(
+        self,
+        prompts: List[str],
+        temperature: float = 0.7,
+        max_tokens: int = 256,
+        timeout_seconds: int | None = None,
+        grammar: Optional[str] = None,
+    ) -> List[str | Exception]:
+        """Run several JSON prompts under one lock hold and one executor hop.
 
-            if not text:
-                logger.warning(
-                    "LLM returned empty text; keys=%s choices=%s",
-                    list(resp.keys()) if resp else [],
-                    (resp.get("choices") if resp else None),
-                )
+        llama.cpp decodes a single sequence per context, so the prompts still run
+        back to back; identical prompts are only generated once. A prompt that
+        fails yields its exception in place of the text.
+        """
+        loop = asyncio.get_running_loop()
+        unique = list(dict.fromkeys(prompts))
 
-            # Trim any think tags if present (HTML-escaped style handled upstream as needed)
-            if "<think>" in text and "</think>" in text:
-                text = text.split("</think>")[-1].strip()
-            if "&lt;think&gt;" in text and "&lt;/think&gt;" in text:
-                text = text.split("&lt;/think&gt;")[-1].strip()
-            return text
+        def _run() -> Dict[str, str | Exception]:
+            out: Dict[str, str | Exception] = {}
+            for prompt in unique:
+                try:
+                    out[prompt] = self._generate_json_sync(prompt, temperature, max_tokens, grammar)
+                except Exception as e:
+                    logger.error("LLM generate_json error: %s", e)
+                    out[prompt] = e
+            return out
 
+        to = (timeout_seconds or min(max(RESPONSE_TIMEOUT, 60), 120)) * len(unique)
         try:
             async with self._lock:
-                to = timeout_seconds or min(max(RESPONSE_TIMEOUT, 60), 120)
-                return await asyncio.wait_for(loop.run_in_executor(None, _run), timeout=to)
+                out = await asyncio.wait_for(loop.run_in_executor(self._executor, _run), timeout=to)
         except asyncio.TimeoutError:
-            logger.error("LLM JSON timeout after %.0fs (prompt len=%d)", to, len(prompt))
-            raise
-        except Exception as e:
-            logger.error("LLM generate_json error: %s", e)
+            logger.error("LLM JSON batch timeout after %.0fs (%d prompts)", to, len(unique))
             raise
+        return [out[prompt] for prompt in prompts]
 
     async def health_check(self) -> bool:
         if not Path(self.model_path).exists():
@@ -197,7 +282,13 @@ class LLMManager:
             return True
 
         try:
-            return await asyncio.wait_for(loop.run_in_executor(None, _probe), timeout=5.0)
+            return await asyncio.wait_for(loop.run_in_executor(self._executor, _probe), timeout=5.0)
         except Exception as e:
             logger.error("Health check failed: %s", e)
-            return False
\ No newline at end of file
+            return False
+
+
+@lru_cache(maxsize=None)
+def get_llm_manager(model_path: str = MODEL_PATH) -> LLMManager:
+    """Shared LLMManager per GGUF file, so the weights are only mapped once."""
+    return LLMManager(model_path)
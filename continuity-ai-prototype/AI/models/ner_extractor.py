@@ -1,9 +1,18 @@
+import asyncio
 import logging
 import re
+from functools import lru_cache
+from pathlib import Path
 from typing import List, Dict, Any, Tuple
 import torch  # type: ignore
 from transformers import pipeline  # type: ignore
-from config.settings import MODELS_CACHE_DIR, NER_CONFIDENCE_THRESHOLD
+from config.settings import (
+    MODELS_CACHE_DIR,
+    NER_BACKEND,
+    NER_CONFIDENCE_THRESHOLD,
+    NER_MODEL_NAME,
+    NER_THREADS,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,28 +37,40 @@ def _normalize_name(name: str) -> str:
 class NERExtractor:
     """Token-classification NER + de-dup + surname merge."""
 
-    def __init__(self, model_name: str = "dslim/bert-base-NER"):
+    def __init__(self, model_name: str = "dslim/bert-base-NER", backend: str = NER_BACKEND):
         self.model_name = model_name
-        logger.info("Loading NER model: %s (cache: %s)", model_name, MODELS_CACHE_DIR)
+        self.backend = backend
+        logger.info("Loading NER model: %s (backend: %s, cache: %s)", model_name, backend, MODELS_CACHE_DIR)
         try:
             # Load model and tokenizer with cache_dir, then pass to pipeline
             from transformers import AutoModelForTokenClassification, AutoTokenizer
 
-            model = AutoModelForTokenClassification.from_pretrained(
-                model_name,
-                cache_dir=MODELS_CACHE_DIR
-            )
             tokenizer = AutoTokenizer.from_pretrained(
                 model_name,
                 cache_dir=MODELS_CACHE_DIR
             )
 
+            model = None
+            if self.backend == "onnx-int8":
+                try:
+                    model = self._load_onnx_int8(model_name)
+                except Exception as e:
+                    # Missing optimum/onnxruntime or failed export: keep serving with FP32
+                    logger.warning("ONNX int8 NER unavailable (%s); falling back to FP32", e)
+                    self.backend = "fp32"
+
+            if model is None:
+                model = AutoModelForTokenClassification.from_pretrained(
+                    model_name,
+                    cache_dir=MODELS_CACHE_DIR
+                )
+
             self.ner_pipeline = pipeline(
                 "ner",
                 model=model,
                 tokenizer=tokenizer,
                 aggregation_strategy="simple",
-                device=0 if torch.cuda.is_available() else -1,
+                device=0 if self.backend == "fp32" and torch.cuda.is_available() else -1,
             )
             logger.info("[OK] NER model loaded from cache")
         except Exception as e:
@@ -68,7 +89,8 @@ class NERExtractor:
     async def extract_entities(self, text: str, time_id: str = "t_000") -> List[Dict[str, Any]]:
         try:
             logger.info("Extracting entities from %d chars...", len(text))
-            ner_results = self.ner_pipeline(text)
+            # the transformer forward pass runs in a worker thread so the loop stays free
+            ner_results = await asyncio.to_thread(self.ner_pipeline, text)
             logger.info("NER found %d entities", len(ner_results))
 
             # Debug: Log raw NER results
@@ -176,6 +198,31 @@ class NERExtractor:
             logger.error("Error extracting entities: %s", e, exc_info=True)
             return []
 
+    @staticmethod
+    def _load_onnx_int8(model_name: str):
+        """ONNX Runtime model with dynamic int8 (VNNI) weights, exported on first use."""
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForTokenClassification, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+        onnx_dir = Path(MODELS_CACHE_DIR) / "onnx" / model_name.replace("/", "--")
+        onnx_file = onnx_dir / "model_quantized.onnx"
+        if not onnx_file.exists():
+            logger.info("Exporting %s to ONNX int8 (one-time): %s", model_name, onnx_dir)
+            exported = ORTModelForTokenClassification.from_pretrained(
+                model_name, export=True, cache_dir=MODELS_CACHE_DIR
+            )
+            ORTQuantizer.from_pretrained(exported).quantize(
+                save_dir=onnx_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False),
+            )
+
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = NER_THREADS
+        return ORTModelForTokenClassification.from_pretrained(
+            onnx_dir, file_name=onnx_file.name, session_options=session_options
+        )
+
     def get_supported_entity_types(self) -> List[str]:
         return list(set(self.label_mapping.values()))
 
@@ -232,4 +279,10 @@ class HybridNERExtractor(NERExtractor):
                     entity_counter += 1
                     logger.debug("Pattern match: %s (%s)", name, entity_type)
 
-        return entities
\ No newline at end of file
+        return entities
+
+
+@lru_cache(maxsize=None)
+def get_ner_extractor(model_name: str = NER_MODEL_NAME) -> HybridNERExtractor:
+    """Shared HybridNERExtractor per model, so the BERT weights are only loaded once."""
+    return HybridNERExtractor(model_name=model_name)
@@ -49,7 +49,7 @@ class RAGPipeline:
         try:
             # Step 1: Retrieve relevant context
             if use_context:
-                context_docs = self._retrieve_context(user_query, top_k)
+                context_docs = await self._retrieve_context(user_query, top_k)
                 logger.info(f"Retrieved {len(context_docs)} context documents")
             else:
                 context_docs = []
@@ -96,7 +96,7 @@ class RAGPipeline:
         """
         try:
             # Retrieve context
-            context_docs = self._retrieve_context(user_query, top_k)
+            context_docs = await self._retrieve_context(user_query, top_k)
 
             # Build prompt
             prompt = self.prompt_builder.build_rag_prompt(
@@ -117,27 +117,27 @@ class RAGPipeline:
             logger.error(f"Error in stream query: {e}")
             raise
 
-    def _retrieve_context(
+    async def _retrieve_context(
         self,
         query: str,
         top_k: int = TOP_K_RESULTS,
     ) -> List[Dict[str, Any]]:
         """Retrieve context documents for a query."""
         try:
-            results = self.vector_db.search(query, top_k=top_k)
+            results = await self.vector_db.search_async(query, top_k=top_k)
             return results
         except Exception as e:
             logger.error(f"Error retrieving context: {e}")
             return []
 
-    def add_knowledge_base(
+    async def add_knowledge_base(
         self,
         documents: List[str],
         metadata: List[Dict[str, Any]] = None,
     ) -> None:
         """Add documents to the knowledge base."""
         try:
-            self.vector_db.add_documents(documents, metadata)
+            await self.vector_db.add_documents_async(documents, metadata)
             logger.info(f"Added {len(documents)} documents to knowledge base")
         except Exception as e:
             logger.error(f"Error adding documents: {e}")
@@ -1,6 +1,7 @@
 """Prompt building for RAG pipeline."""
 import logging
 from typing import List, Dict, Any
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -30,10 +31,14 @@ class PromptBuilder:
         # Add context
         if context_documents:
             prompt += "## Context Information:\n"
-            for i, doc in enumerate(context_documents, 1):
+            distances = np.fromiter(
+                (doc.get("distance", 1.0) for doc in context_documents),
+                dtype=np.float32,
+            )
+            relevances = (1.0 - distances).tolist()
+            for i, (doc, relevance) in enumerate(zip(context_documents, relevances), 1):
                 text = doc.get("text", "")
-                score = doc.get("distance", 1.0)
-                prompt += f"\n[Document {i} - Relevance: {1-score:.2f}]\n{text}\n"
+                prompt += f"\n[Document {i} - Relevance: {relevance:.2f}]\n{text}\n"
             prompt += "\n---\n\n"
 
         # Add chat history
@@ -0,0 +1,71 @@
+"""Coalesce concurrent requests into batches."""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Generic, List, Optional, Tuple, TypeVar
+
+from config.settings import LLM_BATCH_MAX, LLM_BATCH_WAIT_MS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collects items submitted within a short window and hands them to one batch call.
+
+    The handler receives the items in submission order and must return one
+    result per item; an exception in that list is raised to that item's caller.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[T]], Awaitable[List[Any]]],
+        max_batch: int = LLM_BATCH_MAX,
+        max_wait_ms: float = LLM_BATCH_WAIT_MS,
+    ):
+        self.handler = handler
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run(self._queue))
+        fut = loop.create_future()
+        await self._queue.put((item, fut))
+        return await fut
+
+    async def _run(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[T, asyncio.Future]] = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that gave up (timeout/cancel) don't need their item run
+            batch = [(item, fut) for item, fut in batch if not fut.done()]
+            if not batch:
+                continue
+            logger.debug("MicroBatcher dispatching %d item(s)", len(batch))
+            try:
+                results = await self.handler([item for item, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            for (_, fut), result in zip(batch, results):
+                if fut.done():
+                    continue
+                if isinstance(result, BaseException):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
@@ -1,10 +1,12 @@
 """Configuration settings for the AI solution."""
 import os
-from dotenv import load_dotenv
+from importlib.util import find_spec
+from config._env import init_env
 
-load_dotenv()
+init_env()
 
 # Model Configuration
+# Decode is memory-bandwidth-bound on CPU: prefer Q4_K_M (or IQ4_XS) GGUFs over Q6_K/Q8_0/F16
 MODEL_NAME = os.getenv("MODEL_NAME", "DeepSeek-R1-Distill-Llama-8B-Q4_K_M.gguf")
 MODEL_PATH = os.getenv("MODEL_PATH", "./models/DeepSeek-R1-Distill-Llama-8B-Q4_K_M.gguf")
 MODEL_PROVIDER = "llama-cpp"  # Options: "llama-cpp"
@@ -13,9 +15,21 @@ MODEL_PROVIDER = "llama-cpp"  # Options: "llama-cpp"
 VECTOR_DB_TYPE = "chroma"  # Options: "chroma", "faiss"
 VECTOR_DB_PATH = "./data/vector_db"
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"  # Lightweight, fast embedder
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "onnx-int8").lower()  # Options: "onnx-int8", "fp32"
+if EMBEDDING_BACKEND not in ["onnx-int8", "fp32"]:
+    raise ValueError(f"Invalid EMBEDDING_BACKEND: {EMBEDDING_BACKEND}. Must be 'onnx-int8' or 'fp32'")
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
 
 # RAG Configuration
 TOP_K_RESULTS = 5  # Number of similar documents to retrieve
+USE_BINARY_QUANT = os.getenv("USE_BINARY_QUANT", "false").lower() == "true"  # Hamming shortlist + FP32 rerank
+BINARY_QUANT_OVERSAMPLE = 8  # Shortlist size = TOP_K * this factor
+HNSW_PROFILE = os.getenv("HNSW_PROFILE", "balanced").lower()  # Options: "fast", "balanced", "recall"
+if HNSW_PROFILE not in ["fast", "balanced", "recall"]:
+    raise ValueError(f"Invalid HNSW_PROFILE: {HNSW_PROFILE}. Must be 'fast', 'balanced' or 'recall'")
+USE_SEMANTIC_CACHE = os.getenv("USE_SEMANTIC_CACHE", "true").lower() == "true"  # Reuse answers to paraphrased queries
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", 1024))  # Cached answers (LRU)
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95))  # Min cosine similarity for a hit
 CHUNK_SIZE = 512  # Characters per chunk
 CHUNK_OVERLAP = 100  # Overlap between chunks
 
@@ -28,6 +42,10 @@ SEGMENT_COLLECTION_NAME = os.getenv("SEGMENT_COLLECTION_NAME", "story_segments")
 # Web API Configuration
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
 API_PORT = int(os.getenv("API_PORT", 8000))
+# uvloop + httptools ship with uvicorn[standard]; uvloop has no Windows build, so fall back there.
+# One worker only: each would load its own LLM and keep separate in-memory jobs/caches.
+API_LOOP = os.getenv("API_LOOP", "uvloop" if find_spec("uvloop") else "asyncio")
+API_HTTP = os.getenv("API_HTTP", "httptools" if find_spec("httptools") else "h11")
 API_TITLE = "AI Assistant API"
 API_VERSION = "1.0.0"
 
@@ -35,6 +53,8 @@ API_VERSION = "1.0.0"
 ENTITY_EXTRACTION_MODE = os.getenv("ENTITY_EXTRACTION_MODE", "hybrid").lower()
 if ENTITY_EXTRACTION_MODE not in ["hybrid", "slm-only"]:
     raise ValueError(f"Invalid ENTITY_EXTRACTION_MODE: {ENTITY_EXTRACTION_MODE}. Must be 'hybrid' or 'slm-only'")
+EXTRACTION_CACHE_SIZE = int(os.getenv("EXTRACTION_CACHE_SIZE", 256))  # Texts whose extraction results are reused (LRU)
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")  # Local NER that labels candidates before the SLM ("" disables)
 
 # Discord Configuration
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN", "")
@@ -48,3 +68,11 @@ LOG_FILE = "./logs/app.log"
 MAX_CONTEXT_TOKENS = 2000
 RESPONSE_TIMEOUT = 120  # seconds (increased for SLM classification)
 MAX_CONCURRENT_REQUESTS = 10
+# Intra-op threads for the ONNX embedding session; concurrent calls share its pool
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", max(1, (os.cpu_count() or 1) // 2)))
+# llama.cpp runs one generation at a time, so it gets its own larger budget
+LLM_THREADS = int(os.getenv("LLM_THREADS", "4"))
+# Prompt-lookup speculative decoding: tokens drafted per step (0 disables)
+LLM_DRAFT_TOKENS = int(os.getenv("LLM_DRAFT_TOKENS", "10"))
+# Fused attention kernels for the 4096-token context; required for the q8_0 KV cache
+LLM_FLASH_ATTN = os.getenv("LLM_FLASH_ATTN", "true").lower() == "true"
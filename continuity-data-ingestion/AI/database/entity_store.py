@@ -1,7 +1,8 @@
 """Entity storage and management."""
 import logging
 import json
-from typing import List, Dict, Any, Optional
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -19,6 +20,15 @@ class EntityStore:
         """
         self.storage_path = Path(storage_path)
         self.entities: Dict[str, Dict[str, Any]] = {}
+        # Secondary indexes, kept in step with self.entities on every mutation:
+        # entityType -> ordered set of IDs, and ID -> lowercased name + aliases
+        self._by_type: Dict[str, Dict[str, None]] = {}
+        self._search_keys: Dict[str, Tuple[str, ...]] = {}
+        # All search keys joined by NUL, so one str.find scan covers every entity.
+        # Built lazily by search_entities; None means stale.
+        self._search_text: Optional[str] = None
+        self._search_starts: List[int] = []  # offset of each entity's first key
+        self._search_ids: List[str] = []  # entity ID for each offset
         self._load_entities()
         logger.info(f"EntityStore initialized with {len(self.entities)} entities")
 
@@ -29,6 +39,7 @@ class EntityStore:
                 with open(self.storage_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     self.entities = {e["id"]: e for e in data.get("entities", [])}
+                    self._rebuild_indexes()
                     logger.info(f"Loaded {len(self.entities)} entities from {self.storage_path}")
             else:
                 logger.info(f"No existing entity store found at {self.storage_path}")
@@ -37,6 +48,48 @@ class EntityStore:
             logger.error(f"Error loading entities: {e}")
             self.entities = {}
 
+    def _rebuild_indexes(self):
+        """Rebuild all secondary indexes from self.entities."""
+        self._by_type = {}
+        self._search_keys = {}
+        for entity_id, entity in self.entities.items():
+            self._index(entity_id, entity)
+
+    def _index(self, entity_id: str, entity: Dict[str, Any]):
+        """Add an entity to the secondary indexes."""
+        self._by_type.setdefault(entity.get("entityType"), {})[entity_id] = None
+        self._search_keys[entity_id] = tuple(
+            key.lower() for key in [entity.get("name", ""), *entity.get("aliases", [])]
+        )
+        self._search_text = None
+
+    def _unindex(self, entity_id: str):
+        """Remove an entity from the secondary indexes."""
+        entity = self.entities.get(entity_id)
+        if entity is None:
+            return
+        ids = self._by_type.get(entity.get("entityType"))
+        if ids is not None:
+            ids.pop(entity_id, None)
+            if not ids:
+                del self._by_type[entity.get("entityType")]
+        self._search_keys.pop(entity_id, None)
+        self._search_text = None
+
+    def _build_search_text(self):
+        """Join every entity's search keys into one NUL-separated string."""
+        parts: List[str] = []
+        self._search_starts = []
+        self._search_ids = []
+        offset = 0
+        for entity_id, keys in self._search_keys.items():
+            self._search_starts.append(offset)
+            self._search_ids.append(entity_id)
+            for key in keys:
+                parts.append(key)
+                offset += len(key) + 1
+        self._search_text = "\x00".join(parts) + "\x00"
+
     def _save_entities(self):
         """Save entities to storage file."""
         try:
@@ -54,12 +107,13 @@ class EntityStore:
         except Exception as e:
             logger.error(f"Error saving entities: {e}")
 
-    def add_entity(self, entity: Dict[str, Any]) -> str:
+    def add_entity(self, entity: Dict[str, Any], save: bool = True) -> str:
         """
         Add a new entity to the store.
 
         Args:
             entity: Entity dictionary
+            save: Write the store to disk (add_entities saves once for the batch)
 
         Returns:
             Entity ID
@@ -70,8 +124,11 @@ class EntityStore:
             entity_id = f"ent_{len(self.entities) + 1:06d}"
             entity["id"] = entity_id
         
+        self._unindex(entity_id)
         self.entities[entity_id] = entity
-        self._save_entities()
+        self._index(entity_id, entity)
+        if save:
+            self._save_entities()
         logger.info(f"Added entity: {entity_id} ({entity.get('name')})")
         return entity_id
 
@@ -85,10 +142,9 @@ class EntityStore:
         Returns:
             List of entity IDs
         """
-        entity_ids = []
-        for entity in entities:
-            entity_id = self.add_entity(entity)
-            entity_ids.append(entity_id)
+        entity_ids = [self.add_entity(entity, save=False) for entity in entities]
+        if entity_ids:
+            self._save_entities()
         return entity_ids
 
     def get_entity(self, entity_id: str) -> Optional[Dict[str, Any]]:
@@ -122,7 +178,7 @@ class EntityStore:
         Returns:
             List of matching entities
         """
-        return [e for e in self.entities.values() if e.get("entityType") == entity_type]
+        return [self.entities[entity_id] for entity_id in self._by_type.get(entity_type, ())]
 
     def search_entities(self, query: str) -> List[Dict[str, Any]]:
         """
@@ -135,20 +191,21 @@ class EntityStore:
             List of matching entities
         """
         query_lower = query.lower()
+        if "\x00" in query_lower:
+            return []
+        if self._search_text is None:
+            self._build_search_text()
+
         results = []
-        
-        for entity in self.entities.values():
-            # Check name
-            if query_lower in entity.get("name", "").lower():
-                results.append(entity)
-                continue
-            
-            # Check aliases
-            aliases = entity.get("aliases", [])
-            if any(query_lower in alias.lower() for alias in aliases):
-                results.append(entity)
-                continue
-        
+        text, starts, ids = self._search_text, self._search_starts, self._search_ids
+        pos = text.find(query_lower)
+        while pos != -1:
+            # Map the hit back to its entity, then resume at the next entity's keys
+            i = bisect_right(starts, pos) - 1
+            results.append(self.entities[ids[i]])
+            if i + 1 >= len(starts):
+                break
+            pos = text.find(query_lower, starts[i + 1])
         return results
 
     def update_entity(self, entity_id: str, updates: Dict[str, Any]) -> bool:
@@ -168,6 +225,7 @@ class EntityStore:
         
         # Update entity
         entity = self.entities[entity_id]
+        self._unindex(entity_id)
         
         # Merge facts if provided
         if "facts" in updates:
@@ -189,6 +247,7 @@ class EntityStore:
         
         # Increment version
         entity["version"] = entity.get("version", 1) + 1
+        self._index(entity_id, entity)
         
         self._save_entities()
         logger.info(f"Updated entity: {entity_id}")
@@ -205,6 +264,7 @@ class EntityStore:
             True if successful, False otherwise
         """
         if entity_id in self.entities:
+            self._unindex(entity_id)
             del self.entities[entity_id]
             self._save_entities()
             logger.info(f"Deleted entity: {entity_id}")
@@ -214,6 +274,7 @@ class EntityStore:
     def clear_all(self):
         """Clear all entities from the store."""
         self.entities = {}
+        self._rebuild_indexes()
         self._save_entities()
         logger.info("Cleared all entities")
 
@@ -225,9 +286,9 @@ class EntityStore:
             Dictionary with stats
         """
         types = {}
-        for entity in self.entities.values():
-            entity_type = entity.get("entityType", "unknown")
-            types[entity_type] = types.get(entity_type, 0) + 1
+        for entity_type, ids in self._by_type.items():
+            key = "unknown" if entity_type is None else entity_type
+            types[key] = types.get(key, 0) + len(ids)
         
         return {
             "total_entities": len(self.entities),
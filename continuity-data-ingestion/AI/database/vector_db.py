@@ -1,42 +1,122 @@
 """Vector database interface for storing and retrieving embeddings."""
+import asyncio
 import logging
 import os
-from typing import List, Dict, Any, Tuple
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import List, Dict, Any, Tuple, Optional
 import chromadb
-from models.embedder import Embedder
+import numpy as np
+from chromadb.api import ClientAPI
+from models.embedder import Embedder, get_embedder
 from config.settings import (
     VECTOR_DB_PATH,
     EMBEDDING_MODEL,
     TOP_K_RESULTS,
+    MAX_CONCURRENT_REQUESTS,
+    USE_BINARY_QUANT,
+    BINARY_QUANT_OVERSAMPLE,
+    HNSW_PROFILE,
 )
 
 logger = logging.getLogger(__name__)
 
+# Documents embedded and written per batch in add_documents
+ADD_BATCH_SIZE = 64
+
+# Max number of distinct query embeddings kept by VectorDB.search
+QUERY_CACHE_SIZE = 4096
+
+# HNSW graph settings per profile. M and construction_ef are fixed when a
+# collection is created; search_ef trades query latency for recall.
+HNSW_PROFILES: Dict[str, Dict[str, int]] = {
+    "fast": {"hnsw:M": 16, "hnsw:construction_ef": 100, "hnsw:search_ef": 32},
+    "balanced": {"hnsw:M": 16, "hnsw:construction_ef": 200, "hnsw:search_ef": 64},
+    "recall": {"hnsw:M": 32, "hnsw:construction_ef": 400, "hnsw:search_ef": 200},
+}
+
+# Number of set bits in each byte value, for Hamming distance on packed codes
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# One client per process; every collection shares the same on-disk handle
+_CLIENT: Optional[ClientAPI] = None
+
+
+def _get_client() -> ClientAPI:
+    """Return the process-wide ChromaDB client, creating it on first use."""
+    global _CLIENT
+    if _CLIENT is None:
+        os.makedirs(VECTOR_DB_PATH, exist_ok=True)
+        _CLIENT = chromadb.PersistentClient(path=VECTOR_DB_PATH)
+    return _CLIENT
+
 
 class VectorDB:
     """Manages vector database operations using ChromaDB."""
 
-    def __init__(self, collection_name: str = "documents"):
+    def __init__(
+        self,
+        collection_name: str = "documents",
+        embedder: Optional[Embedder] = None,
+        profile: str = HNSW_PROFILE,
+    ):
         """
         Initialize vector database.
 
         Args:
             collection_name: Name of the collection to use
+            embedder: Embedder to share; defaults to the process-wide one
+            profile: HNSW_PROFILES key ("fast", "balanced" or "recall")
         """
-        os.makedirs(VECTOR_DB_PATH, exist_ok=True)
-        
+        if profile not in HNSW_PROFILES:
+            raise ValueError(f"Unknown HNSW profile: {profile}")
+        self.profile = profile
+
         # Use new ChromaDB API (0.5.x)
-        self.client = chromadb.PersistentClient(
-            path=VECTOR_DB_PATH,
-        )
-        
+        self.client = _get_client()
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
-            metadata={"hnsw:space": "cosine"},
+            metadata=self._collection_metadata(),
         )
-        self.embedder = Embedder(EMBEDDING_MODEL)
+        self._check_hnsw_params()
+        self.embedder = embedder or get_embedder(EMBEDDING_MODEL)
+        # Normalized query -> float32 embedding, in LRU order (oldest first)
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        # Blocking Chroma/embedding calls from async callers run here, never on the loop
+        self._pool = ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_REQUESTS,
+            thread_name_prefix="chroma",
+        )
+        self._searcher = BatchedSearcher(self)
+        # (ids, 1-bit-per-dimension codes) for the binary shortlist, built lazily on
+        # search. Replaced as one tuple so a search never pairs ids and codes from
+        # different builds
+        self._binary_index: Optional[Tuple[List[str], np.ndarray]] = None
+        self._binary_lock = threading.Lock()
         logger.info(f"VectorDB initialized with collection: {collection_name}")
 
+    def _collection_metadata(self) -> Dict[str, Any]:
+        """Metadata for creating the collection: distance metric plus HNSW profile."""
+        # Embeddings are unit-length, so inner product ranks exactly like cosine
+        return {"hnsw:space": "ip", **HNSW_PROFILES[self.profile]}
+
+    def _check_hnsw_params(self) -> None:
+        """Warn when an existing collection was built with other HNSW settings."""
+        current = self.collection.metadata or {}
+        stale = {
+            key: current.get(key)
+            for key, value in HNSW_PROFILES[self.profile].items()
+            if current.get(key) != value
+        }
+        if stale:
+            logger.warning(
+                f"Collection {self.collection.name} was created with {stale}, not the "
+                f"'{self.profile}' profile; clear_collection(hard=True) rebuilds it"
+            )
+
     def add_documents(
         self,
         documents: List[str],
@@ -52,62 +132,279 @@ class VectorDB:
             ids: List of document IDs
         """
         try:
-            embeddings = self.embedder.embed_batch(documents)
-            
-            if metadata is None:
-                metadata = [{} for _ in documents]
-            
-            self.collection.add(
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadata,
-                ids=ids or [f"doc_{i}" for i in range(len(documents))],
+            metadata, ids = self._prepare_documents(documents, metadata, ids)
+            for start in range(0, len(documents), ADD_BATCH_SIZE):
+                end = start + ADD_BATCH_SIZE
+                self._add_batch(documents[start:end], metadata[start:end], ids[start:end])
+            self._invalidate_binary_index()
+            logger.info(f"Added {len(documents)} documents to vector DB")
+        except Exception as e:
+            logger.error(f"Error adding documents: {e}")
+            raise
+
+    async def add_documents_async(
+        self,
+        documents: List[str],
+        metadata: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ) -> None:
+        """
+        Add documents to the vector database without blocking the event loop.
+
+        Batches are embedded and written on the worker pool, with at most two
+        in flight so one can embed while the other is written to the index.
+
+        Args:
+            documents: List of document texts
+            metadata: List of metadata dicts (one per document)
+            ids: List of document IDs
+        """
+        try:
+            metadata, ids = self._prepare_documents(documents, metadata, ids)
+            semaphore = asyncio.Semaphore(2)
+
+            async def _add_batch(start: int) -> None:
+                end = start + ADD_BATCH_SIZE
+                async with semaphore:
+                    chunk = documents[start:end]
+                    embeddings = await self._in_pool(self.embedder.embed_batch, chunk)
+                    await self._in_pool(
+                        self.collection.add,
+                        documents=chunk,
+                        embeddings=embeddings,
+                        metadatas=metadata[start:end],
+                        ids=ids[start:end],
+                    )
+
+            await asyncio.gather(
+                *(_add_batch(start) for start in range(0, len(documents), ADD_BATCH_SIZE))
             )
+            self._invalidate_binary_index()
             logger.info(f"Added {len(documents)} documents to vector DB")
         except Exception as e:
             logger.error(f"Error adding documents: {e}")
             raise
 
-    def search(self, query: str, top_k: int = TOP_K_RESULTS) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _prepare_documents(
+        documents: List[str],
+        metadata: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Fill in default metadata and IDs for a list of documents."""
+        if metadata is None:
+            metadata = [{} for _ in documents]
+        return metadata, ids or [f"doc_{i}" for i in range(len(documents))]
+
+    def _add_batch(
+        self,
+        documents: List[str],
+        metadata: List[Dict[str, Any]],
+        ids: List[str],
+    ) -> None:
+        """Embed one batch of documents and write it to the collection."""
+        self.collection.add(
+            documents=documents,
+            embeddings=self.embedder.embed_batch(documents),
+            metadatas=metadata,
+            ids=ids,
+        )
+
+    def search(
+        self,
+        query: str,
+        top_k: int = TOP_K_RESULTS,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Search for documents similar to query.
 
         Args:
             query: Query text
             top_k: Number of results to return
+            query_embedding: Embedding of query from embed_query_async; embedded here when omitted
 
         Returns:
             List of dicts with 'text', 'metadata', 'distance', and 'id'
         """
         try:
-            query_embedding = self.embedder.embed_text(query)
-            
+            if query_embedding is None:
+                query_embedding = self._embed_query(query)
+            if USE_BINARY_QUANT:
+                return self._search_binary(query_embedding, top_k)
+
             results = self.collection.query(
-                query_embeddings=[query_embedding.tolist()],
+                query_embeddings=query_embedding.reshape(1, -1),
                 n_results=top_k,
-                include=["embeddings", "distances", "documents", "metadatas"],
+                include=["distances", "documents", "metadatas"],
             )
-            
-            # Format results
-            formatted_results = []
-            for i in range(len(results["documents"][0])):
-                formatted_results.append({
-                    "text": results["documents"][0][i],
-                    "metadata": results["metadatas"][0][i],
-                    "distance": results["distances"][0][i],
-                    "id": results["ids"][0][i] if "ids" in results else f"result_{i}",
-                })
-            
+
+            formatted_results = self._format_results(results, 0)
             logger.debug(f"Search returned {len(formatted_results)} results")
             return formatted_results
         except Exception as e:
             logger.error(f"Error searching vector DB: {e}")
             raise
 
+    async def search_async(
+        self,
+        query: str,
+        top_k: int = TOP_K_RESULTS,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for documents similar to query, batched with concurrent callers.
+
+        Args:
+            query: Query text
+            top_k: Number of results to return
+            query_embedding: Embedding of query from embed_query_async; embedded here when omitted
+
+        Returns:
+            List of dicts with 'text', 'metadata', 'distance', and 'id'
+        """
+        if USE_BINARY_QUANT:
+            # The Hamming scan is an in-memory pass, so there is nothing to batch
+            return await self._in_pool(self.search, query, top_k, query_embedding)
+        return await self._searcher.search(query, top_k, query_embedding)
+
+    @staticmethod
+    def _format_results(results: Dict[str, Any], row: int) -> List[Dict[str, Any]]:
+        """
+        Format one row of a ChromaDB query result.
+
+        Args:
+            results: Raw result dict from collection.query
+            row: Index of the query embedding within the batch
+
+        Returns:
+            List of dicts with 'text', 'metadata', 'distance', and 'id'
+        """
+        formatted_results = []
+        for i in range(len(results["documents"][row])):
+            formatted_results.append({
+                "text": results["documents"][row][i],
+                "metadata": results["metadatas"][row][i],
+                "distance": results["distances"][row][i],
+                "id": results["ids"][row][i] if "ids" in results else f"result_{i}",
+            })
+        return formatted_results
+
+    def _search_binary(self, query_embedding: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        """
+        Two-stage search: Hamming shortlist on binary codes, then FP32 rerank.
+
+        Args:
+            query_embedding: Query embedding
+            top_k: Number of results to return
+
+        Returns:
+            List of dicts with 'text', 'metadata', 'distance', and 'id'
+        """
+        # Snapshot once: writers may invalidate or rebuild the index mid-search
+        index = self._binary_index
+        if index is None:
+            index = self._build_binary_index()
+        ids, codes = index
+        if not ids:
+            return []
+
+        query_code = np.packbits(query_embedding > 0)
+        hamming = _POPCOUNT[np.bitwise_xor(codes, query_code)].sum(axis=1, dtype=np.int32)
+
+        n_candidates = min(len(ids), top_k * BINARY_QUANT_OVERSAMPLE)
+        shortlist = np.argpartition(hamming, n_candidates - 1)[:n_candidates]
+        candidates = self.collection.get(
+            ids=[ids[i] for i in shortlist],
+            include=["embeddings", "documents", "metadatas"],
+        )
+
+        # Rerank the shortlist by exact inner-product distance (vectors are unit-length)
+        vectors = np.asarray(candidates["embeddings"], dtype=np.float32)
+        distances = 1.0 - vectors @ query_embedding
+        order = np.argsort(distances)[:top_k]
+
+        formatted_results = [
+            {
+                "text": candidates["documents"][i],
+                "metadata": candidates["metadatas"][i],
+                "distance": float(distances[i]),
+                "id": candidates["ids"][i],
+            }
+            for i in order
+        ]
+        logger.debug(f"Binary search reranked {n_candidates} candidates")
+        return formatted_results
+
+    def _build_binary_index(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Pack every stored embedding into a 1-bit-per-dimension code.
+
+        Returns:
+            The (ids, codes) pair now installed as the binary index
+        """
+        with self._binary_lock:
+            # Another search may have built it while this one waited for the lock
+            if self._binary_index is not None:
+                return self._binary_index
+            stored = self.collection.get(include=["embeddings"])
+            ids = list(stored["ids"])
+            if ids:
+                vectors = np.asarray(stored["embeddings"], dtype=np.float32)
+                codes = np.packbits(vectors > 0, axis=1)
+            else:
+                codes = np.zeros((0, 0), dtype=np.uint8)
+            self._binary_index = (ids, codes)
+        logger.info(f"Built binary index for {len(ids)} documents")
+        return ids, codes
+
+    def _invalidate_binary_index(self) -> None:
+        """Force the binary index to be rebuilt on the next search."""
+        # Waits out an in-flight build, so a build that missed this write can't be kept
+        with self._binary_lock:
+            self._binary_index = None
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a search query, reusing the cached vector for repeat queries.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Contiguous float32 embedding (1D), passed to ChromaDB without list conversion
+        """
+        # Only the key is normalized: the model embeds the query as given, and case is
+        # kept in the key so a cased model never gets another casing's vector back
+        key = query.strip()
+        with self._query_cache_lock:
+            cached = self._query_cache.get(key)
+            if cached is not None:
+                self._query_cache.move_to_end(key)
+                return cached
+
+        embedding = self.embedder.embed_text(query)
+        with self._query_cache_lock:
+            self._query_cache[key] = embedding
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return embedding
+
+    async def embed_query_async(self, query: str) -> np.ndarray:
+        """Embed a search query on the worker pool, reusing cached vectors."""
+        return await self._in_pool(self._embed_query, query)
+
+    def clear_query_cache(self) -> None:
+        """Drop all cached query embeddings."""
+        with self._query_cache_lock:
+            self._query_cache.clear()
+        logger.debug("Query embedding cache cleared")
+
     def delete_documents(self, ids: List[str]) -> None:
         """Delete documents by ID."""
         try:
             self.collection.delete(ids=ids)
+            self._invalidate_binary_index()
             logger.info(f"Deleted {len(ids)} documents")
         except Exception as e:
             logger.error(f"Error deleting documents: {e}")
@@ -117,24 +414,166 @@ class VectorDB:
         """Get information about the collection."""
         try:
             count = self.collection.count()
+            metadata = self.collection.metadata or {}
             return {
                 "name": self.collection.name,
                 "document_count": count,
                 "embedding_dimension": self.embedder.get_embedding_dimension(),
+                "hnsw_profile": self.profile,
+                "hnsw": {
+                    key.split(":", 1)[1]: metadata.get(key)
+                    for key in ("hnsw:space", *HNSW_PROFILES[self.profile])
+                },
+                "binary_quant": USE_BINARY_QUANT,
             }
         except Exception as e:
             logger.error(f"Error getting collection info: {e}")
             raise
 
-    def clear_collection(self) -> None:
-        """Clear all documents from collection."""
+    def clear_collection(self, hard: bool = False) -> None:
+        """
+        Clear all documents from collection.
+
+        Args:
+            hard: Drop and recreate the collection (rebuilding its on-disk index)
+                instead of deleting the documents in place
+        """
         try:
-            self.client.delete_collection(name=self.collection.name)
-            self.collection = self.client.get_or_create_collection(
-                name=self.collection.name,
-                metadata={"hnsw:space": "cosine"},
-            )
-            logger.info("Collection cleared")
+            if hard:
+                self.client.delete_collection(name=self.collection.name)
+                self.collection = self.client.get_or_create_collection(
+                    name=self.collection.name,
+                    metadata=self._collection_metadata(),
+                )
+            else:
+                ids = self.collection.get(include=[])["ids"]
+                batch_size = self.client.get_max_batch_size()
+                for start in range(0, len(ids), batch_size):
+                    self.collection.delete(ids=ids[start:start + batch_size])
+            self._invalidate_binary_index()
+            logger.info(f"Collection cleared ({'hard' if hard else 'in place'})")
         except Exception as e:
             logger.error(f"Error clearing collection: {e}")
             raise
+
+    async def delete_documents_async(self, ids: List[str]) -> None:
+        """Delete documents by ID on the worker pool."""
+        await self._in_pool(self.delete_documents, ids)
+
+    async def get_collection_info_async(self) -> Dict[str, Any]:
+        """Get information about the collection on the worker pool."""
+        return await self._in_pool(self.get_collection_info)
+
+    async def clear_collection_async(self, hard: bool = False) -> None:
+        """Clear all documents from collection on the worker pool."""
+        await self._in_pool(self.clear_collection, hard)
+
+    async def _in_pool(self, func, *args, **kwargs):
+        """Run a blocking call on the worker pool and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, partial(func, *args, **kwargs))
+
+
+class BatchedSearcher:
+    """Coalesces concurrent searches into a single ChromaDB query."""
+
+    def __init__(
+        self,
+        vector_db: VectorDB,
+        max_batch: int = MAX_CONCURRENT_REQUESTS,
+        max_wait_ms: float = 3.0,
+    ):
+        """
+        Initialize the batched searcher.
+
+        Args:
+            vector_db: Vector database whose collection is queried
+            max_batch: Maximum number of queries merged into one call
+            max_wait_ms: How long to wait for more queries before flushing
+        """
+        self.vector_db = vector_db
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = TOP_K_RESULTS,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Queue a search and wait for its batch to be executed.
+
+        Args:
+            query: Query text
+            top_k: Number of results to return
+            query_embedding: Precomputed embedding of query, if the caller has one
+
+        Returns:
+            List of dicts with 'text', 'metadata', 'distance', and 'id'
+        """
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+        embedding = query_embedding
+        if embedding is None:
+            embedding = await self.vector_db._in_pool(self.vector_db._embed_query, query)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((embedding, top_k, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Drain the queue, issuing one collection query per batch."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Query for the largest top_k in the batch, then trim per caller
+            n_results = max(top_k for _, top_k, _ in batch)
+            try:
+                results = await self.vector_db._in_pool(
+                    self.vector_db.collection.query,
+                    query_embeddings=np.stack([embedding for embedding, _, _ in batch]),
+                    n_results=n_results,
+                    include=["distances", "documents", "metadatas"],
+                )
+            except Exception as e:
+                logger.error(f"Error in batched vector search: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            logger.debug(f"Batched search served {len(batch)} queries")
+            for row, (_, top_k, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result(VectorDB._format_results(results, row)[:top_k])
+
+
+@lru_cache(maxsize=None)
+def get_vector_db(collection_name: str = "documents") -> VectorDB:
+    """
+    Get the shared VectorDB for a collection.
+
+    The first call loads the embedder and opens the collection; later calls
+    return the same instance so the model and index are only loaded once.
+
+    Args:
+        collection_name: Name of the collection to use
+
+    Returns:
+        Cached VectorDB instance
+    """
+    return VectorDB(collection_name)
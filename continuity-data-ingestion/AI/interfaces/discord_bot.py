@@ -1,8 +1,10 @@
 """Discord bot interface."""
 import logging
 import asyncio
+import re
 from typing import Optional
 import discord
+import numpy as np
 from discord.ext import commands
 
 from database.vector_db import VectorDB
@@ -13,6 +15,12 @@ from config.settings import DISCORD_PREFIX
 
 logger = logging.getLogger(__name__)
 
+# User mentions, in both the plain (<@id>) and nickname (<@!id>) forms
+_MENTION_RE = re.compile(r"<@!?(\d+)>")
+
+# Streamed replies are flushed to Discord once this many characters accumulate
+STREAM_CHUNK_CHARS = 1800
+
 
 def create_bot(
     vector_db: VectorDB,
@@ -51,8 +59,11 @@ def create_bot(
         try:
             # Show typing indicator
             async with message.channel.typing():
-                # Clean query (remove mention)
-                query = message.content.replace(f"<@{bot.user.id}>", "").strip()
+                # Clean query (remove the bot's mention; other users' mentions stay)
+                bot_id = str(bot.user.id)
+                query = _MENTION_RE.sub(
+                    lambda m: "" if m.group(1) == bot_id else m.group(0), message.content
+                ).strip()
                 
                 if not query:
                     await message.reply("Please ask me something!")
@@ -65,30 +76,53 @@ def create_bot(
                 context_manager.add_message(user_id, "user", query)
                 chat_history = context_manager.get_history(user_id)
 
-                # Get response
-                response, sources = await rag_pipeline.query(
+                # Stream the response, sending chunks as they fill up
+                # (Discord limit: 2000 chars). Only the first chunk is a reply.
+                sources = await rag_pipeline.retrieve_context(query)
+                parts = []
+                buffer = ""
+                replied = False
+
+                async def send_chunk(chunk: str):
+                    nonlocal replied
+                    if replied:
+                        await message.channel.send(chunk)
+                    else:
+                        await message.reply(chunk)
+                        replied = True
+
+                async for token in rag_pipeline.query_stream(
                     user_query=query,
                     chat_history=chat_history,
-                    use_context=True,
-                )
+                    context_docs=sources,
+                ):
+                    parts.append(token)
+                    buffer += token
+                    if len(buffer) >= STREAM_CHUNK_CHARS:
+                        # Break at the last whitespace so words aren't split across messages
+                        cut = max(buffer.rfind(" "), buffer.rfind("\n"))
+                        if cut <= 0:
+                            cut = len(buffer)
+                        await send_chunk(buffer[:cut])
+                        buffer = buffer[cut:].lstrip()
+
+                if buffer.strip():
+                    await send_chunk(buffer)
 
                 # Add to history
+                response = "".join(parts)
                 context_manager.add_message(user_id, "assistant", response)
 
-                # Split response if too long (Discord limit: 2000 chars)
-                if len(response) > 1900:
-                    chunks = [response[i:i+1900] for i in range(0, len(response), 1900)]
-                    for chunk in chunks:
-                        await message.reply(chunk)
-                else:
-                    await message.reply(response)
-
                 # Add sources as separate message if available
                 if sources:
-                    sources_text = "📚 **Sources:**\n"
-                    for i, source in enumerate(sources[:3], 1):
-                        score = 1 - source.get("distance", 1.0)
-                        sources_text += f"{i}. (Relevance: {score:.1%})\n"
+                    distances = np.fromiter(
+                        (source.get("distance", 1.0) for source in sources[:3]),
+                        dtype=np.float32,
+                    )
+                    scores = (1.0 - distances).tolist()
+                    sources_text = "📚 **Sources:**\n" + "".join(
+                        f"{i}. (Relevance: {score:.1%})\n" for i, score in enumerate(scores, 1)
+                    )
                     
                     if len(sources_text) < 1900:
                         await message.reply(sources_text)
@@ -2,22 +2,41 @@
 import logging
 from fastapi import FastAPI, HTTPException, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import asyncio
+import hashlib
+import orjson
+from collections import OrderedDict
 
-from database.vector_db import VectorDB
+from database.vector_db import VectorDB, get_vector_db
 from database.entity_store import EntityStore
 from models.llm_manager import LLMManager
 from models.entity_extractor import EntityExtractor
 from rag.pipeline import RAGPipeline
+from rag.semantic_cache import SemanticCache, history_key
 from utils.context_manager import ContextManager
 from utils.segment_manager import SegmentManager
-from config.settings import API_TITLE, API_VERSION, API_HOST, API_PORT
+from utils.ttl_cache import async_ttl_cache
+from config.settings import (
+    API_TITLE, API_VERSION, API_HOST, API_PORT, USE_SEMANTIC_CACHE,
+    EXTRACTION_CACHE_SIZE,
+)
 
 logger = logging.getLogger(__name__)
 
+# /query-stream token frames; most tokens need no JSON escaping and skip the serializer
+_TOKEN_PREFIX = b'{"token":"'
+_TOKEN_SUFFIX = b'","done":false}\n'
+
+
+def _token_frame(token: str) -> bytes:
+    """Encode one streamed token as an NDJSON line."""
+    if token.isprintable() and '"' not in token and "\\" not in token:
+        return _TOKEN_PREFIX + token.encode() + _TOKEN_SUFFIX
+    return orjson.dumps({"token": token, "done": False}) + b"\n"
+
 
 # Pydantic models
 class QueryRequest(BaseModel):
@@ -70,13 +89,20 @@ class SegmentIngestionRequest(BaseModel):
 
 # Initialize FastAPI app
 def create_app(
-    vector_db: VectorDB,
+    vector_db: Optional[VectorDB],
     llm_manager: LLMManager,
     context_manager: ContextManager,
 ) -> FastAPI:
     """Create and configure FastAPI application."""
 
-    app = FastAPI(title=API_TITLE, version=API_VERSION)
+    # Fall back to the process-wide instance so the embedder is never loaded twice
+    vector_db = vector_db or get_vector_db()
+
+    app = FastAPI(
+        title=API_TITLE,
+        version=API_VERSION,
+        default_response_class=ORJSONResponse,
+    )
     
     # CORS middleware enabled for development
     app.add_middleware(
@@ -92,15 +118,58 @@ def create_app(
     entity_extractor = EntityExtractor(llm_manager)
     entity_store = EntityStore()
     segment_manager = SegmentManager(vector_db, entity_extractor, entity_store)
+    semantic_cache = SemanticCache()
+
+    # Exact-match extraction results, so resubmitting the same text skips the
+    # LLM and doesn't store duplicate entities: text hash -> (entities, entity_ids)
+    extraction_cache: "OrderedDict[str, Tuple[List[Dict[str, Any]], List[str]]]" = OrderedDict()
+
+    def extraction_key(text: str, time_id: str) -> str:
+        # Case matters: extraction keys on capitalized names, so only whitespace is trimmed
+        digest = hashlib.blake2b(text.strip().encode(), digest_size=16)
+        digest.update(b"\x00" + time_id.encode())
+        return digest.hexdigest()
+
+    def cached_extraction(key: str) -> Optional[Tuple[List[Dict[str, Any]], List[str]]]:
+        cached = extraction_cache.get(key)
+        if cached is None:
+            return None
+        # Entities can be deleted (and their IDs reused) after the fact; re-extract then
+        entities, entity_ids = cached
+        if not all(
+            entity_store.get_entity(entity_id) is entity
+            for entity, entity_id in zip(entities, entity_ids)
+        ):
+            del extraction_cache[key]
+            return None
+        extraction_cache.move_to_end(key)
+        return cached
+
+    def cache_extraction(key: str, entities: List[Dict[str, Any]], entity_ids: List[str]):
+        extraction_cache[key] = (entities, entity_ids)
+        extraction_cache.move_to_end(key)
+        while len(extraction_cache) > EXTRACTION_CACHE_SIZE:
+            extraction_cache.popitem(last=False)
+
+    # Bumped by every write so cached status endpoints never lag behind it
+    app.state.cache_version = 0
+
+    def cache_version():
+        return app.state.cache_version
+
+    def invalidate_cache():
+        app.state.cache_version += 1
+        semantic_cache.clear()
 
     # Routes
 
     @app.get("/health", response_model=HealthResponse)
+    @async_ttl_cache(ttl=2.0, version=cache_version)
     async def health_check():
         """Health check endpoint."""
         try:
             llm_ok = await llm_manager.health_check()
-            vector_db_info = vector_db.get_collection_info()
+            vector_db_info = await vector_db.get_collection_info_async()
             
             return {
                 "status": "healthy" if llm_ok else "degraded",
@@ -112,7 +181,9 @@ def create_app(
             logger.error(f"Health check failed: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
-    @app.post("/query", response_model=QueryResponse)
+    # Hot routes return ORJSONResponse directly: the payload is already plain JSON
+    # data, so skip response_model validation and the jsonable_encoder walk
+    @app.post("/query", responses={200: {"model": QueryResponse}})
     async def query(request: QueryRequest):
         """Process a user query."""
         try:
@@ -124,23 +195,38 @@ def create_app(
             # Get chat history
             chat_history = context_manager.get_history(request.user_id)
 
-            logger.info("Running RAG pipeline...")
-            # Run RAG pipeline
-            response, sources = await rag_pipeline.query(
-                user_query=request.query,
-                chat_history=chat_history,
-                use_context=request.use_context,
-            )
+            # Reuse the answer to an equivalent question asked in the same conversation state
+            cached = None
+            query_embedding = None
+            if USE_SEMANTIC_CACHE and request.use_context:
+                query_embedding = await vector_db.embed_query_async(request.query)
+                context_key = history_key(chat_history[:-1])
+                cached = semantic_cache.lookup(query_embedding, context_key)
+
+            if cached is not None:
+                logger.info("Serving response from semantic cache")
+                response, sources = cached
+            else:
+                logger.info("Running RAG pipeline...")
+                # Run RAG pipeline
+                response, sources = await rag_pipeline.query(
+                    user_query=request.query,
+                    chat_history=chat_history,
+                    use_context=request.use_context,
+                    precomputed_embedding=query_embedding,
+                )
+                if USE_SEMANTIC_CACHE and request.use_context:
+                    semantic_cache.store(query_embedding, context_key, response, sources)
 
             logger.info(f"Generated response of length {len(response)}")
             # Add assistant response to history
             context_manager.add_message(request.user_id, "assistant", response)
 
-            return {
+            return ORJSONResponse({
                 "response": response,
                 "sources": sources,
                 "user_id": request.user_id,
-            }
+            })
         except Exception as e:
             logger.error(f"Query failed: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=str(e))
@@ -149,8 +235,6 @@ def create_app(
     async def query_stream(request: QueryRequest):
         """Stream response for a query as JSON."""
         try:
-            import json
-            
             context_manager.add_message(request.user_id, "user", request.query)
             chat_history = context_manager.get_history(request.user_id)
 
@@ -162,13 +246,13 @@ def create_app(
                 ):
                     response_text += token
                     # Send each token as JSON
-                    yield json.dumps({"token": token, "done": False}) + "\n"
+                    yield _token_frame(token)
 
                 # Add to history
                 context_manager.add_message(request.user_id, "assistant", response_text)
                 
                 # Send final completion message
-                yield json.dumps({"token": "", "done": True, "response": response_text}) + "\n"
+                yield orjson.dumps({"token": "", "done": True, "response": response_text}) + b"\n"
 
             return StreamingResponse(generate(), media_type="application/x-ndjson")
         except Exception as e:
@@ -187,6 +271,7 @@ def create_app(
                 time_id=request.time_id,
                 metadata=request.metadata
             )
+            invalidate_cache()
             
             return result
         except Exception as e:
@@ -197,10 +282,11 @@ def create_app(
     async def add_documents(request: AddDocumentRequest):
         """Add documents to the knowledge base."""
         try:
-            rag_pipeline.add_knowledge_base(
+            await rag_pipeline.add_knowledge_base(
                 documents=request.documents,
                 metadata=request.metadata,
             )
+            invalidate_cache()
             return {
                 "message": f"Added {len(request.documents)} documents",
                 "count": len(request.documents),
@@ -210,10 +296,11 @@ def create_app(
             raise HTTPException(status_code=500, detail=str(e))
 
     @app.get("/db-info")
+    @async_ttl_cache(ttl=2.0, version=cache_version)
     async def get_db_info():
         """Get vector database information."""
         try:
-            return vector_db.get_collection_info()
+            return await vector_db.get_collection_info_async()
         except Exception as e:
             logger.error(f"Failed to get DB info: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -232,28 +319,36 @@ def create_app(
         try:
             logger.info(f"Extracting entities from text (length: {len(request.text)})")
             logger.debug(f"Story text preview: {request.text[:200]}...")
-            
-            entities = await entity_extractor.extract_entities(
-                text=request.text,
-                time_id=request.time_id
-            )
-            
-            logger.info(f"Extraction complete. Found {len(entities)} entities")
-            
-            # Store extracted entities
-            if entities:
-                entity_ids = entity_store.add_entities(entities)
-                logger.info(f"Stored entities with IDs: {entity_ids}")
+
+            key = extraction_key(request.text, request.time_id)
+            cached = cached_extraction(key)
+            if cached is not None:
+                entities, entity_ids = cached
+                logger.info(f"Reusing extraction for identical text ({len(entities)} entities)")
             else:
-                entity_ids = []
-                logger.warning("No entities were extracted from the text")
+                entities = await entity_extractor.extract_entities(
+                    text=request.text,
+                    time_id=request.time_id
+                )
+                
+                logger.info(f"Extraction complete. Found {len(entities)} entities")
+                
+                # Store extracted entities
+                if entities:
+                    entity_ids = entity_store.add_entities(entities)
+                    invalidate_cache()
+                    logger.info(f"Stored entities with IDs: {entity_ids}")
+                    cache_extraction(key, entities, entity_ids)
+                else:
+                    entity_ids = []
+                    logger.warning("No entities were extracted from the text")
             
-            return {
+            return ORJSONResponse({
                 "message": f"Extracted {len(entities)} entities",
                 "count": len(entities),
                 "entities": entities,
                 "entity_ids": entity_ids
-            }
+            })
         except Exception as e:
             logger.error(f"Failed to extract entities: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=str(e))
@@ -262,22 +357,17 @@ def create_app(
     async def extract_entities_stream(request: ExtractEntitiesRequest):
         """Stream entity extraction from story text."""
         try:
-            import json
-            
             async def generate():
-                async for update in entity_extractor.extract_entities_stream(
+                async for frame, done, entities in entity_extractor.extract_entities_stream(
                     text=request.text,
                     time_id=request.time_id
                 ):
-                    yield update
+                    yield frame
                     
                     # If extraction is complete, store entities
-                    try:
-                        data = json.loads(update)
-                        if data.get("status") == "complete" and "entities" in data:
-                            entity_store.add_entities(data["entities"])
-                    except:
-                        pass
+                    if done and entities:
+                        entity_store.add_entities(entities)
+                        invalidate_cache()
 
             return StreamingResponse(generate(), media_type="application/x-ndjson")
         except Exception as e:
@@ -289,10 +379,10 @@ def create_app(
         """Get all stored entities."""
         try:
             entities = entity_store.get_all_entities()
-            return {
+            return ORJSONResponse({
                 "count": len(entities),
                 "entities": entities
-            }
+            })
         except Exception as e:
             logger.error(f"Failed to get entities: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -304,7 +394,7 @@ def create_app(
             entity = entity_store.get_entity(entity_id)
             if not entity:
                 raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
-            return entity
+            return ORJSONResponse(entity)
         except HTTPException:
             raise
         except Exception as e:
@@ -316,11 +406,11 @@ def create_app(
         """Get all entities of a specific type."""
         try:
             entities = entity_store.get_entities_by_type(entity_type)
-            return {
+            return ORJSONResponse({
                 "type": entity_type,
                 "count": len(entities),
                 "entities": entities
-            }
+            })
         except Exception as e:
             logger.error(f"Failed to get entities by type: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -330,11 +420,11 @@ def create_app(
         """Search entities by name or alias."""
         try:
             entities = entity_store.search_entities(query)
-            return {
+            return ORJSONResponse({
                 "query": query,
                 "count": len(entities),
                 "entities": entities
-            }
+            })
         except Exception as e:
             logger.error(f"Failed to search entities: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -363,6 +453,7 @@ def create_app(
         """Delete an entity."""
         try:
             success = entity_store.delete_entity(entity_id)
+            invalidate_cache()
             if not success:
                 raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
             return {"message": f"Entity {entity_id} deleted"}
@@ -382,7 +473,8 @@ def create_app(
             if confirm != "true":
                 raise HTTPException(status_code=400, detail="Confirmation required")
             
-            vector_db.clear_collection()
+            await vector_db.clear_collection_async()
+            invalidate_cache()
             return {"message": "Vector database cleared", "status": "success"}
         except HTTPException:
             raise
@@ -395,7 +487,7 @@ def create_app(
         """Get database statistics."""
         try:
             return {
-                "vector_db": vector_db.get_collection_info(),
+                "vector_db": await vector_db.get_collection_info_async(),
                 "entity_store": entity_store.get_stats(),
                 "timestamp": str(__import__('datetime').datetime.now()),
                 "status": "healthy"
@@ -405,6 +497,7 @@ def create_app(
             raise HTTPException(status_code=500, detail=str(e))
 
     @app.get("/entities-stats")
+    @async_ttl_cache(ttl=2.0, version=cache_version)
     async def get_entity_stats():
         """Get statistics about stored entities."""
         try:
@@ -418,6 +511,7 @@ def create_app(
         """Clear all entities from the store."""
         try:
             entity_store.clear_all()
+            invalidate_cache()
             return {"message": "All entities cleared"}
         except Exception as e:
             logger.error(f"Failed to clear entities: {e}")
@@ -1,12 +1,20 @@
 """Script to load documents into the vector database knowledge base."""
+import io
+import itertools
 import logging
-from database.vector_db import VectorDB
+from database.vector_db import get_vector_db
 from utils.logger import setup_logging
 
 # Setup logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# Text-file chunks embedded per add_documents call, the read buffer size, and
+# the characters tokenized at a time when chunking
+FILE_CHUNK_BATCH = 256
+FILE_READ_BUFFER = 1 << 20
+FILE_TOKENIZE_BLOCK = 1 << 16
+
 
 def load_nscc_data():
     """Load NSCC knowledge base (primary data)."""
@@ -16,22 +24,21 @@ def load_nscc_data():
         events_documents, events_metadata
     )
     
-    db = VectorDB(collection_name="documents")
-    
-    # Generate unique IDs for pages
-    page_ids = [f"nscc_page_{i}" for i in range(len(nscc_pages_documents))]
-    logger.info(f"Adding {len(nscc_pages_documents)} NSCC website documents...")
-    db.add_documents(nscc_pages_documents, metadata=nscc_pages_metadata, ids=page_ids)
-    
-    # Generate unique IDs for FAQ
-    faq_ids = [f"nscc_faq_{i}" for i in range(len(nscc_faq_documents))]
-    logger.info(f"Adding {len(nscc_faq_documents)} NSCC FAQ documents...")
-    db.add_documents(nscc_faq_documents, metadata=nscc_faq_metadata, ids=faq_ids)
+    db = get_vector_db("documents")
     
-    # Generate unique IDs for events
-    event_ids = [f"event_{i+1}" for i in range(len(events_documents))]
-    logger.info(f"Adding {len(events_documents)} campus event documents...")
-    db.add_documents(events_documents, metadata=events_metadata, ids=event_ids)
+    # Pages, FAQ and events go in as one batch so they are embedded and written together
+    documents = nscc_pages_documents + nscc_faq_documents + events_documents
+    metadata = nscc_pages_metadata + nscc_faq_metadata + events_metadata
+    ids = (
+        [f"nscc_page_{i}" for i in range(len(nscc_pages_documents))]
+        + [f"nscc_faq_{i}" for i in range(len(nscc_faq_documents))]
+        + [f"event_{i+1}" for i in range(len(events_documents))]
+    )
+    logger.info(
+        f"Adding {len(nscc_pages_documents)} NSCC website, {len(nscc_faq_documents)} FAQ "
+        f"and {len(events_documents)} campus event documents..."
+    )
+    db.add_documents(documents, metadata=metadata, ids=ids)
     
     info = db.get_collection_info()
     logger.info(f"Knowledge base now contains {info['document_count']} documents")
@@ -42,7 +49,7 @@ def load_sample_documents():
     """Load sample documents into the vector database (BACKUP/LEGACY)."""
     
     # Initialize vector DB
-    db = VectorDB(collection_name="documents")
+    db = get_vector_db("documents")
     
     # Sample documents - replace with your actual website content
     documents = [
@@ -101,27 +108,59 @@ def load_sample_documents():
     print("\n✓ Knowledge base loaded successfully!")
 
 
-def load_from_text_file(file_path: str, chunk_size: int = 500):
+def _iter_token_chunks(f, tokenizer, chunk_tokens: int):
+    """
+    Yield consecutive pieces of a text file that are each chunk_tokens tokens long.
+
+    Chunks are cut on token offsets but sliced from the original text, so casing
+    and whitespace are preserved. Blocks are read up to a line end so no word is
+    split between two tokenizer calls.
+    """
+    carry = ""
+    while True:
+        block = f.read(FILE_TOKENIZE_BLOCK) + f.readline()
+        text = carry + block
+        offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+        # Hold back the trailing partial chunk until the file is exhausted
+        usable = len(offsets) // chunk_tokens * chunk_tokens if block else len(offsets)
+        for start in range(0, usable, chunk_tokens):
+            end = min(start + chunk_tokens, usable)
+            next_start = offsets[end][0] if end < len(offsets) else len(text)
+            yield text[offsets[start][0]:next_start]
+        if not block:
+            return
+        carry = text[offsets[usable][0]:] if usable < len(offsets) else ""
+
+
+def load_from_text_file(file_path: str, chunk_tokens: int = 254):
     """
-    Load documents from a text file, splitting into chunks.
+    Load documents from a text file, splitting into token-sized chunks.
     
     Args:
         file_path: Path to text file
-        chunk_size: Size of each chunk in characters
+        chunk_tokens: Tokens per chunk (default fills MiniLM's 256-token window
+            after [CLS]/[SEP], so chunks are embedded without truncation or padding)
     """
-    db = VectorDB(collection_name="documents")
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Split into chunks
-    chunks = [content[i:i+chunk_size] for i in range(0, len(content), chunk_size)]
-    
-    # Create metadata for each chunk
-    metadata = [{"source": file_path, "chunk_index": i} for i in range(len(chunks))]
-    
-    logger.info(f"Adding {len(chunks)} chunks from {file_path}...")
-    db.add_documents(chunks, metadata=metadata)
+    db = get_vector_db("documents")
+    tokenizer = db.embedder.tokenizer
+    
+    # Read and embed the file a batch of chunks at a time, so embedding starts right
+    # away and memory stays bounded by the batch rather than the file size
+    chunk_count = 0
+    with io.open(file_path, 'r', encoding='utf-8', buffering=FILE_READ_BUFFER) as f:
+        pieces = _iter_token_chunks(f, tokenizer, chunk_tokens)
+        while True:
+            chunks = list(itertools.islice(pieces, FILE_CHUNK_BATCH))
+            if not chunks:
+                break
+    
+            indices = range(chunk_count, chunk_count + len(chunks))
+            metadata = [{"source": file_path, "chunk_index": i} for i in indices]
+            db.add_documents(chunks, metadata=metadata, ids=[f"doc_{i}" for i in indices])
+            chunk_count += len(chunks)
+            logger.info(f"Added {chunk_count} chunks from {file_path} so far...")
+    
+    logger.info(f"Added {chunk_count} chunks from {file_path}")
     
     info = db.get_collection_info()
     logger.info(f"Knowledge base now contains {info['document_count']} documents")
@@ -135,18 +174,24 @@ def load_from_directory(directory_path: str):
         directory_path: Path to directory containing text files
     """
     import os
+    from concurrent.futures import ThreadPoolExecutor
     
-    db = VectorDB(collection_name="documents")
-    documents = []
-    metadata = []
+    db = get_vector_db("documents")
     
-    for filename in os.listdir(directory_path):
-        if filename.endswith('.txt'):
-            file_path = os.path.join(directory_path, filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                documents.append(content)
-                metadata.append({"source": filename, "file_path": file_path})
+    filenames = [name for name in os.listdir(directory_path) if name.endswith('.txt')]
+    file_paths = [os.path.join(directory_path, name) for name in filenames]
+    
+    # Read files concurrently so the disk stays busy, then embed them as one batch
+    def read_file(file_path: str) -> str:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        documents = list(executor.map(read_file, file_paths))
+    metadata = [
+        {"source": filename, "file_path": file_path}
+        for filename, file_path in zip(filenames, file_paths)
+    ]
     
     logger.info(f"Adding {len(documents)} documents from {directory_path}...")
     db.add_documents(documents, metadata=metadata)
@@ -157,7 +202,7 @@ def load_from_directory(directory_path: str):
 
 def clear_knowledge_base():
     """Clear all documents from the knowledge base."""
-    db = VectorDB(collection_name="documents")
+    db = get_vector_db("documents")
     db.clear_collection()
     logger.info("Knowledge base cleared")
 
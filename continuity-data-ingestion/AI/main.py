@@ -4,12 +4,13 @@ import logging
 import sys
 from typing import Literal
 
-from database.vector_db import VectorDB
-from models.llm_manager import LLMManager
+# Settings load first: they set env defaults before tokenizers import
+from config.settings import API_HOST, API_PORT, API_LOOP, API_HTTP
+from database.vector_db import VectorDB, get_vector_db
+from models.llm_manager import LLMManager, get_llm_manager
 from interfaces.web_api import create_app
 from utils.context_manager import ContextManager
 from utils.logger import setup_logging
-from config.settings import API_HOST, API_PORT
 
 # Setup logging
 setup_logging()
@@ -19,7 +20,6 @@ logger = logging.getLogger(__name__)
 async def run_web_api(vector_db: VectorDB, llm_manager: LLMManager):
     """Run the FastAPI web server."""
     import uvicorn
-    import threading
 
     context_manager = ContextManager()
     app = create_app(vector_db, llm_manager, context_manager)
@@ -28,29 +28,16 @@ async def run_web_api(vector_db: VectorDB, llm_manager: LLMManager):
         app=app,
         host=API_HOST,
         port=API_PORT,
+        loop=API_LOOP,
+        http=API_HTTP,
         log_level="info",
         server_header=False,
     )
     
     logger.info(f"Starting web API on {API_HOST}:{API_PORT}")
-    
-    # Run uvicorn in a blocking manner with Python's asyncio
-    # Use a thread to run the sync uvicorn.run()
-    def run_server():
-        uvicorn.run(app, host=API_HOST, port=API_PORT, log_level="info")
-    
-    # Run server in thread so it blocks properly
-    thread = threading.Thread(target=run_server, daemon=True)
-    thread.start()
-    
-    # Keep the async function running
-    logger.info("Server thread started, keeping process alive...")
-    try:
-        while True:
-            await asyncio.sleep(10)
-    except KeyboardInterrupt:
-        logger.info("Server interrupted")
-        raise
+
+    # Serve on this loop, so handlers share it (and the LLM lock) with startup code
+    await uvicorn.Server(config).serve()
 
 
 async def main():
@@ -64,8 +51,8 @@ async def main():
     llm_manager = None
     
     try:
-        vector_db = VectorDB()
-        llm_manager = LLMManager()
+        vector_db = get_vector_db()
+        llm_manager = get_llm_manager()
 
         # Check health
         logger.info("Checking system health...")
@@ -73,7 +60,7 @@ async def main():
         if not llm_ok:
             logger.warning("⚠ LLM not available. Ensure the GGUF path is correct and llama-cpp can load it.")
         
-        db_info = vector_db.get_collection_info()
+        db_info = await vector_db.get_collection_info_async()
         logger.info(f"Vector DB: {db_info['document_count']} documents")
         
         # Auto-load NSCC data if DB is empty
@@ -81,7 +68,7 @@ async def main():
             logger.info("Knowledge base is empty, auto-loading NSCC data...")
             from load_knowledge_base import load_nscc_data
             load_nscc_data()
-            db_info = vector_db.get_collection_info()
+            db_info = await vector_db.get_collection_info_async()
             logger.info(f"Vector DB now contains: {db_info['document_count']} documents")
 
         # Run web API server
@@ -95,7 +82,13 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        if API_LOOP == "uvloop":
+            # uvicorn only installs its loop when it owns it; here main() does
+            import uvloop
+
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Shutting down...")
         print("\n✓ Application terminated")
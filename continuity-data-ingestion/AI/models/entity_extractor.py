@@ -1,14 +1,98 @@
 """Entity extraction from story text."""
 import logging
-import json
 import re
 import asyncio
-from typing import List, Dict, Any
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+import orjson
 from models.llm_manager import LLMManager
-from config.settings import ENTITY_EXTRACTION_MODE
+from config.settings import ENTITY_EXTRACTION_MODE, SPACY_MODEL
 
 logger = logging.getLogger(__name__)
 
+try:
+    # google-re2 matches in linear time with a DFA; same API and findall results
+    import re2 as _dfa_re
+except ImportError:
+    _dfa_re = re
+
+try:
+    # A small spaCy pipeline labels most candidates locally, so only the names it
+    # does not recognize cost an SLM call
+    import spacy
+except ImportError:
+    spacy = None
+
+# Capitalized word runs: the entity candidates scanned over the full story text
+_NAME_RE = _dfa_re.compile(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b')
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Shorter (stripped) texts can't contain a candidate: names need more than 2 letters
+_MIN_TEXT_LENGTH = 3
+
+# "<Name> kingdom", "the <Name> sword", ...: candidates named by the noun after them,
+# all keywords in one alternation so the text is scanned once
+_KEYWORD_RE = _dfa_re.compile(
+    r'(?i)(?:the\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s+'
+    r'(?:kingdom|castle|sword|magic|battle|guild|curse)\b'
+)
+
+# Candidates per batched classification prompt: the numbered answers have to fit
+# in generate()'s 256-token budget
+CLASSIFY_BATCH_SIZE = 20
+
+# spaCy NER labels -> entity types
+_SPACY_TYPES = {
+    'PERSON': 'character',
+    'GPE': 'location', 'LOC': 'location', 'FAC': 'location',
+    'ORG': 'organization',
+    'PRODUCT': 'object',
+    'EVENT': 'event',
+    'NORP': 'concept', 'LAW': 'concept', 'LANGUAGE': 'concept', 'WORK_OF_ART': 'concept',
+}
+
+# Classified names remembered per extractor; a name's type rarely depends on the chunk
+TYPE_CACHE_SIZE = 4096
+
+# Classification calls in flight per extractor; llama.cpp runs them one at a time,
+# an engine with continuous batching can merge them
+CLASSIFY_CONCURRENCY = 8
+
+# "3. person" / "3) place" answer lines of a batched classification
+_ANSWER_LINE_RE = re.compile(r'^\s*(\d+)[.)]\s*([a-z]+)', re.IGNORECASE | re.MULTILINE)
+
+# Capitalized words that are not names (sentence starters, verbs, adjectives)
+_COMMON_WORDS = frozenset({
+    'The', 'And', 'But', 'Once', 'A', 'An', 'In', 'On', 'At', 'By', 'With', 'For',
+    'They', 'He', 'She', 'It', 'We', 'You', 'I', 'That', 'This', 'Which', 'Who', 'What',
+    'Until', 'Their', 'Over', 'All', 'When', 'Where', 'Why', 'How', 'From', 'To', 'Is', 'Are',
+    'Was', 'Were', 'Be', 'Being', 'Been', 'Have', 'Has', 'Had', 'Do', 'Does', 'Did', 'Will',
+    'Would', 'Could', 'Should', 'May', 'Might', 'Must', 'Can', 'Not', 'No', 'Yes', 'Protected',
+    'Ruled', 'Lived', 'Threatened', 'Alongside',
+    # Descriptive words (adjectives, adverbs)
+    'Faraway', 'Dark', 'Brave', 'Fair', 'Great', 'Golden', 'Ancient', 'Sacred', 'Forbidden',
+    'Mighty', 'Evil', 'Good', 'Bad', 'Small', 'Large', 'Big', 'Little', 'New', 'Old', 'Young'
+})
+
+
+@lru_cache(maxsize=None)
+def _load_spacy(model_name: str):
+    """Load a spaCy pipeline once; None if spaCy or the model isn't installed."""
+    if spacy is None or not model_name:
+        return None
+    try:
+        # Only the entity recognizer is used; skip the parser and lemmatizer
+        return spacy.load(model_name, exclude=["parser", "lemmatizer"])
+    except OSError as e:
+        logger.warning(f"spaCy model '{model_name}' unavailable ({e}); classifying with the SLM only")
+        return None
+
+
+# First frame of every extract_entities_stream response
+_EXTRACTING_FRAME = orjson.dumps({"status": "extracting", "message": "Analyzing text for entities..."}) + b"\n"
+
 
 class EntityExtractor:
     """Extracts story entities (characters, objects, events, etc.) from text."""
@@ -21,6 +105,9 @@ class EntityExtractor:
             llm_manager: LLM manager instance for entity extraction
         """
         self.llm_manager = llm_manager
+        self._classify_sem = asyncio.Semaphore(CLASSIFY_CONCURRENCY)
+        # Candidate name -> entity type ('none' included), least recently used first
+        self._type_cache: "OrderedDict[str, str]" = OrderedDict()
         logger.info("EntityExtractor initialized")
 
     def _build_extraction_prompt(self, text: str) -> str:
@@ -53,6 +140,10 @@ Characters (comma-separated names):"""
         Returns:
             List of entity dictionaries in the specified format
         """
+        if not text or len(text.strip()) < _MIN_TEXT_LENGTH:
+            logger.info("Text too short for entity extraction; skipping")
+            return []
+
         try:
             logger.info(f"Extracting entities from {len(text)} characters of text...")
             logger.info(f"Using extraction mode: {ENTITY_EXTRACTION_MODE}")
@@ -89,33 +180,7 @@ Characters (comma-separated names):"""
             List of entity dictionaries
         """
         try:
-            # Step 1: Loose regex capture (high recall, okay with noise)
-            candidates = self._capture_entity_candidates(text)
-            logger.info(f"Initial candidates: {len(candidates)}")
-            
-            # Step 2: Classify each candidate
-            entities = []
-            for i, candidate in enumerate(candidates, 1):
-                try:
-                    logger.info(f"Processing {i}/{len(candidates)}: '{candidate}'")
-                    entity_type = await asyncio.wait_for(
-                        self._classify_entity_type(candidate, text),
-                        timeout=10.0
-                    )
-                    if entity_type and entity_type != 'none':
-                        entity_dict = {
-                            'name': candidate,
-                            'type': entity_type
-                        }
-                        entities.append(entity_dict)
-                        logger.info(f"+ '{candidate}' -> {entity_type}")
-                    else:
-                        logger.info(f"- '{candidate}' (rejected)")
-                except asyncio.TimeoutError:
-                    logger.warning(f"Timeout on '{candidate}', skipping")
-                except Exception as e:
-                    logger.error(f"Error on '{candidate}': {e}")
-            
+            entities = [entity async for entity in self._iter_entities_hybrid(text)]
             logger.info(f"Hybrid extraction complete: {len(entities)} entities found")
             return entities
             
@@ -123,6 +188,120 @@ Characters (comma-separated names):"""
             logger.error(f"Error in hybrid extraction: {e}", exc_info=True)
             return []
 
+    async def _iter_entities_hybrid(self, text: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield hybrid-extracted entities as soon as each one is classified.
+
+        Cached names come first, then names spaCy recognizes, then each SLM batch
+        in candidate order while the later batches are still running.
+
+        Args:
+            text: Story text to analyze
+
+        Yields:
+            Entity dictionaries with 'name' and 'type'
+        """
+        # Step 1: Loose regex capture (high recall, okay with noise); the scans
+        # cover the whole story, so keep them off the event loop
+        candidates = await asyncio.to_thread(self._capture_entity_candidates, text)
+        logger.info(f"Initial candidates: {len(candidates)}")
+        if not candidates:
+            return
+
+        # Step 2: Reuse the types of names classified before
+        pending = []
+        for candidate in candidates:
+            cached = self._cached_type(candidate)
+            if cached is None:
+                pending.append(candidate)
+                continue
+            entity = self._classified_entity(candidate, cached)
+            if entity:
+                yield entity
+        logger.info(f"Classification cache hits: {len(candidates) - len(pending)}/{len(candidates)}")
+
+        # Step 3: Label what spaCy recognizes, one pass over the whole text
+        if pending:
+            spacy_types = await asyncio.to_thread(self._spacy_types, text)
+            if spacy_types:
+                unlabeled = []
+                for candidate in pending:
+                    entity_type = spacy_types.get(candidate)
+                    if entity_type is None:
+                        unlabeled.append(candidate)
+                        continue
+                    self._remember_type(candidate, entity_type)
+                    yield self._classified_entity(candidate, entity_type)
+                logger.info(f"spaCy labeled {len(pending) - len(unlabeled)}/{len(pending)} candidates")
+                pending = unlabeled
+
+        # Step 4: Classify the rest, CLASSIFY_BATCH_SIZE per SLM call, with the
+        # calls issued concurrently (bounded by _classify_sem)
+
+        context = text[:300]  # sliced once; every batch prompt shares it
+        batches = [
+            pending[i:i + CLASSIFY_BATCH_SIZE]
+            for i in range(0, len(pending), CLASSIFY_BATCH_SIZE)
+        ]
+
+        async def _classify(batch: List[str]) -> Dict[str, str]:
+            async with self._classify_sem:
+                return await self._classify_entities_batch(batch, context)
+
+        tasks = [asyncio.ensure_future(_classify(batch)) for batch in batches]
+        try:
+            for batch, task in zip(batches, tasks):
+                try:
+                    batch_types = await task
+                except Exception as e:
+                    logger.error(f"Error classifying {len(batch)} candidates: {e}")
+                    continue
+
+                for candidate in batch:
+                    entity_type = batch_types.get(candidate)
+                    if entity_type is None:
+                        # No answer line (truncated or misnumbered reply): not a verdict,
+                        # so leave it uncached for the next document to classify
+                        logger.debug("? %r (unanswered)", candidate)
+                        continue
+                    self._remember_type(candidate, entity_type)
+                    entity = self._classified_entity(candidate, entity_type)
+                    if entity:
+                        yield entity
+        finally:
+            # Consumer stopped early (e.g. the client disconnected): drop unfinished batches
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _spacy_types(text: str) -> Dict[str, str]:
+        """Entity types spaCy assigns to spans of the text (first label of a span wins)."""
+        nlp = _load_spacy(SPACY_MODEL)
+        if nlp is None:
+            return {}
+        try:
+            doc = nlp(text)
+        except ValueError as e:
+            # Texts past nlp.max_length (1M chars by default) are refused; the SLM
+            # classifies every candidate instead
+            logger.warning(f"spaCy skipped {len(text)} characters of text: {e}")
+            return {}
+        types: Dict[str, str] = {}
+        for ent in doc.ents:
+            entity_type = _SPACY_TYPES.get(ent.label_)
+            if entity_type:
+                types.setdefault(ent.text, entity_type)
+        return types
+
+    @staticmethod
+    def _classified_entity(candidate: str, entity_type: str) -> Optional[Dict[str, Any]]:
+        """Log a classification; return the entity dict unless it was rejected."""
+        if entity_type == 'none':
+            logger.debug("- %r (rejected)", candidate)
+            return None
+        logger.debug("+ %r -> %s", candidate, entity_type)
+        return {'name': candidate, 'type': entity_type}
+
     async def _extract_entities_slm_only(self, text: str) -> List[Dict[str, Any]]:
         """
         SLM-only approach: Use SLM to directly extract entity names.
@@ -156,9 +335,7 @@ Names:"""
             )
             
             # Log full response for debugging
-            logger.info(f"=== SLM FULL RESPONSE ===")
-            logger.info(f"{response}")
-            logger.info(f"=== END RESPONSE ===")
+            logger.debug("=== SLM FULL RESPONSE ===\n%s\n=== END RESPONSE ===", response)
             
             # Parse names line by line
             entities = []
@@ -186,11 +363,11 @@ Names:"""
                             'name': name,
                             'type': 'character'  # For now, assume all extracted names are characters
                         })
-                        logger.info(f"+ Found name: '{name}'")
+                        logger.debug("+ Found name: %r", name)
                     
             except Exception as e:
                 logger.error(f"Error parsing SLM response: {e}")
-                logger.debug(f"Response was: {response[:300]}")
+                logger.debug("Response was: %s", response[:300])
             
             logger.info(f"SLM-only extraction complete: {len(entities)} names found")
             return entities
@@ -199,34 +376,6 @@ Names:"""
             logger.error(f"Error in SLM-only extraction: {e}", exc_info=True)
             return []
 
-    def _normalize_entity_type(self, entity_type: str) -> str:
-        """
-        Normalize entity type to standard types.
-        
-        Args:
-            entity_type: Raw entity type from SLM
-            
-        Returns:
-            Normalized entity type or 'none'
-        """
-        entity_type_lower = entity_type.lower().strip()
-        
-        # Map variations to standard types
-        if any(x in entity_type_lower for x in ['person', 'character', 'human', 'animal']):
-            return 'character'
-        elif any(x in entity_type_lower for x in ['place', 'location', 'city', 'building', 'land']):
-            return 'location'
-        elif any(x in entity_type_lower for x in ['thing', 'object', 'item', 'weapon', 'tool']):
-            return 'object'
-        elif any(x in entity_type_lower for x in ['event', 'incident', 'happening']):
-            return 'event'
-        elif any(x in entity_type_lower for x in ['organization', 'org', 'group', 'company', 'faction']):
-            return 'organization'
-        elif any(x in entity_type_lower for x in ['concept', 'ability', 'power', 'idea']):
-            return 'concept'
-        else:
-            return 'none'
-
     def _capture_entity_candidates(self, text: str) -> List[str]:
         """
         Capture potential entities using loose regex (high recall).
@@ -237,234 +386,108 @@ Names:"""
         Returns:
             List of candidate entity names
         """
-        import re
-        
         candidates = set()
         
         # Capture all capitalized words (including multi-word names)
-        capitalized = re.findall(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b', text)
+        capitalized = _NAME_RE.findall(text)
         for word in capitalized:
             if len(word) > 2 and len(word.split()) <= 3:
                 candidates.add(word)
         
         # Also capture keywords patterns
-        keywords = ['kingdom', 'castle', 'sword', 'magic', 'battle', 'guild', 'curse']
-        for keyword in keywords:
-            pattern = r'(?:the\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s+' + keyword + r'\b'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if len(match) > 2:
-                    candidates.add(match)
+        for match in _KEYWORD_RE.findall(text):
+            if len(match) > 2:
+                candidates.add(match)
+
+        # Drop sentence starters and common verbs/adjectives in one set difference,
+        # before each surviving candidate costs an SLM classification
+        candidates.difference_update(_COMMON_WORDS)
+
+        # Case/whitespace variants ("Dark Forest", "Dark  forest") are one name: keep
+        # the first casing in sorted order (capitalized forms first), single-spaced
+        by_key: Dict[str, str] = {}
+        for name in sorted(_WHITESPACE_RE.sub(' ', name) for name in candidates):
+            by_key.setdefault(name.lower(), name)
+        names = list(by_key.values())
         
-        logger.debug(f"Captured {len(candidates)} candidates: {sorted(candidates)}")
-        return sorted(list(candidates))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Captured %d candidates: %s", len(names), names)
+        return names
 
-    async def _validate_entity_candidate(self, candidate: str, text: str) -> bool:
+    def _build_classification_prompt(self, candidates: List[str], context: str) -> str:
         """
-        Use SLM to validate if a candidate is an actual entity.
-        
+        Build a prompt classifying several numbered candidates at once.
+
         Args:
-            candidate: Potential entity name
-            text: Story context
-            
+            candidates: Entity names, numbered in this order
+            context: Story excerpt shared by every batch of the document
+
         Returns:
-            True if it's a real entity, False otherwise
+            Formatted prompt string
         """
-        try:
-            # Show context around the candidate
-            context_match = text.find(candidate)
-            if context_match != -1:
-                start = max(0, context_match - 50)
-                end = min(len(text), context_match + len(candidate) + 50)
-                context = text[start:end]
-            else:
-                context = text[:200]
-            
-            prompt = f"""Is '{candidate}' a real entity name (character, place, object, etc.) in this story? 
-Context: ...{context}...
+        numbered = "\n".join(f"{i}. {name}" for i, name in enumerate(candidates, 1))
+        # Story and instruction first, names last: every batch of a document shares the
+        # prefix, and llama.cpp only prefills past the prefix it kept from the last call
+        return f"""Story: {context}
 
-Answer only: YES or NO"""
-            
-            response = await self.llm_manager.generate(
-                prompt=prompt,
-                temperature=0.1,
-            )
-            
-            is_entity = 'YES' in response.upper()
-            logger.debug(f"Validation '{candidate}': {is_entity} (response: {response[:50]})")
-            return is_entity
-            
-        except asyncio.TimeoutError:
-            logger.warning(f"Validation timeout for '{candidate}' - assuming entity")
-            return True  # Default to True on timeout
-        except Exception as e:
-            logger.warning(f"Validation error for '{candidate}': {e}")
-            return False
+For each numbered name, answer person, place, thing or none.
 
-    async def _classify_entity_type(self, entity_name: str, text: str) -> str:
+{numbered}
+
+Answers (one "number. answer" per line):
+"""
+
+    async def _classify_entities_batch(self, candidates: List[str], context: str) -> Dict[str, str]:
         """
-        Use SLM to classify the type of entity.
-        
+        Use one SLM call to classify several candidates.
+
         Args:
-            entity_name: Validated entity name
-            text: Story context
-            
+            candidates: Entity names, numbered in the prompt in this order
+            context: Story excerpt, sliced once per document by the caller
+
         Returns:
-            Entity type: character, location, object, event, organization, concept, or none
+            Mapping of answered candidates to entity type; candidates without an
+            answer line are left out
         """
-        try:
-            # Ultra-short context to prevent crashes
-            context = text[:150]
-            
-            # Very simple prompt
-            prompt = f"""Is "{entity_name}" a person/character, place/location, or thing/object?
-
-Story: {context}
-
-Answer (person/place/thing/none):"""
-            
-            response = await self.llm_manager.generate(
-                prompt=prompt,
-                temperature=0.1,
-            )
-            
-            # Map response
-            response_lower = response.strip().lower()
-            logger.debug(f"'{entity_name}' -> '{response_lower}'")
-            
-            if 'person' in response_lower or 'character' in response_lower:
-                return 'character'
-            elif 'place' in response_lower or 'location' in response_lower:
-                return 'location'
-            elif 'thing' in response_lower or 'object' in response_lower:
-                return 'object'
-            else:
-                return 'none'
-            
-        except Exception as e:
-            logger.warning(f"Classification error for '{entity_name}': {e}")
+        response = await self.llm_manager.generate(
+            prompt=self._build_classification_prompt(candidates, context),
+            temperature=0.1,
+        )
+        logger.debug("Batch of %d -> %r", len(candidates), response)
+
+        types: Dict[str, str] = {}
+        for number, answer in _ANSWER_LINE_RE.findall(response):
+            index = int(number) - 1
+            if 0 <= index < len(candidates):
+                types[candidates[index]] = self._answer_to_type(answer.lower())
+        return types
+
+    def _cached_type(self, entity_name: str) -> Optional[str]:
+        """Previously classified type of a name, or None if it was never classified."""
+        entity_type = self._type_cache.get(entity_name)
+        if entity_type is not None:
+            self._type_cache.move_to_end(entity_name)
+        return entity_type
+
+    def _remember_type(self, entity_name: str, entity_type: str) -> None:
+        """Cache a classification, evicting the least recently used beyond TYPE_CACHE_SIZE."""
+        self._type_cache[entity_name] = entity_type
+        self._type_cache.move_to_end(entity_name)
+        while len(self._type_cache) > TYPE_CACHE_SIZE:
+            self._type_cache.popitem(last=False)
+
+    @staticmethod
+    def _answer_to_type(answer: str) -> str:
+        """Map a lowercased person/place/thing answer to an entity type ('none' otherwise)."""
+        if 'person' in answer or 'character' in answer:
+            return 'character'
+        elif 'place' in answer or 'location' in answer:
+            return 'location'
+        elif 'thing' in answer or 'object' in answer:
+            return 'object'
+        else:
             return 'none'
 
-    def _extract_entities_heuristic(self, text: str, time_id: str) -> List[Dict[str, Any]]:
-        """
-        DEPRECATED: Use the hybrid regex + SLM approach instead.
-        """
-        return []
-        import re
-        
-        entities_dict = {}  # Deduplicate by normalized name only (first type wins)
-        
-        # Helper to normalize names (lowercase for dedup, keep original for display)
-        def add_entity(name, entity_type):
-            normalized = name.lower().strip()
-            # Avoid very long captures (likely regex errors)
-            if len(name) > 100:
-                return
-            # Avoid multi-word false positives like "protected the"
-            if len(normalized.split()) > 3:
-                return
-            # Skip if already seen (first type wins)
-            if normalized in entities_dict:
-                return
-            entities_dict[normalized] = {'type': entity_type, 'name': name}
-        
-        # ===== CHARACTERS: Capitalized words (excluding common words) =====
-        name_contexts = re.findall(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b', text)
-        common_words = {'The', 'And', 'But', 'Once', 'A', 'An', 'In', 'On', 'At', 'By', 'With', 'For', 
-                       'They', 'He', 'She', 'It', 'We', 'You', 'I', 'That', 'This', 'Which', 'Who', 'What',
-                       'Until', 'Their', 'Over', 'All', 'When', 'Where', 'Why', 'How', 'From', 'To', 'Is', 'Are',
-                       'Was', 'Were', 'Be', 'Being', 'Been', 'Have', 'Has', 'Had', 'Do', 'Does', 'Did', 'Will',
-                       'Would', 'Could', 'Should', 'May', 'Might', 'Must', 'Can', 'Not', 'No', 'Yes', 'Protected',
-                       'Ruled', 'Lived', 'Threatened', 'Alongside',
-                       # Descriptive words (adjectives, adverbs)
-                       'Faraway', 'Dark', 'Brave', 'Fair', 'Great', 'Golden', 'Ancient', 'Sacred', 'Forbidden',
-                       'Mighty', 'Evil', 'Good', 'Bad', 'Small', 'Large', 'Big', 'Little', 'New', 'Old', 'Young'}
-        
-        # Check if a word appears in lowercase (indicates it's probably an adjective, not a proper noun)
-        # Only filter words that are KNOWN descriptive adjectives
-        lowercase_words = re.findall(r'\b([a-z]+)\b', text.lower())
-        
-        # List of adjectives we know to filter (appear as both lowercase and capitalized)
-        known_adjectives = {'faraway', 'dark', 'brave', 'fair', 'great', 'golden', 'ancient', 'sacred'}
-        
-        for name in name_contexts:
-            if name not in common_words and len(name) > 2 and len(name.split()) <= 2:
-                # Skip if it's a known adjective that appears in lowercase in the text
-                if name.lower() not in known_adjectives or name.lower() not in lowercase_words:
-                    add_entity(name, 'character')
-        
-        # ===== LOCATIONS: Only match clear location phrases =====
-        location_keywords = ['kingdom', 'castle', 'realm', 'forest', 'village', 'city', 'land', 'tower']
-        for keyword in location_keywords:
-            # Match only 1-word adjective/name before location keyword, with "the" optional
-            pattern = r'(?:the\s+)?([A-Z][a-z]+)\s+' + keyword + r'\b'
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                name = match.group(1)
-                if name not in common_words:
-                    add_entity(name, 'location')
-        
-        # ===== OBJECTS: Sword, crown, ring, etc. =====
-        object_keywords = ['sword', 'crown', 'ring', 'amulet', 'artifact', 'weapon', 'staff', 'wand',
-                          'shield', 'axe', 'bow', 'armor', 'gem', 'stone', 'chalice']
-        for keyword in object_keywords:
-            pattern = r'(?:the\s+)?([A-Z][a-z]+)\s+' + keyword + r'\b'
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                name = match.group(1)
-                if name not in common_words:
-                    add_entity(name, 'object')
-        
-        # ===== EVENTS: Battle, war, ceremony, etc. =====
-        event_keywords = ['battle', 'war', 'ceremony', 'meeting', 'coronation', 'quest', 'siege']
-        for keyword in event_keywords:
-            pattern = r'(?:the\s+)?([A-Z][a-z]+)\s+' + keyword + r'\b'
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                name = match.group(1)
-                if name not in common_words:
-                    add_entity(name, 'event')
-        
-        # ===== ORGANIZATIONS: Kingdom, guild, order, etc. =====
-        org_keywords = ['guild', 'order', 'council', 'empire', 'society', 'brotherhood', 'faction']
-        for keyword in org_keywords:
-            pattern = r'(?:the\s+)?([A-Z][a-z]+)\s+' + keyword + r'\b'
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                name = match.group(1)
-                if name not in common_words:
-                    add_entity(name, 'organization')
-        
-        # ===== CONCEPTS: Magic, curse, prophecy, etc. =====
-        concept_keywords = ['magic', 'curse', 'prophecy', 'spell', 'power', 'fate', 'darkness', 'light']
-        for keyword in concept_keywords:
-            pattern = r'\b([A-Z][a-z]+)\s+' + keyword + r'\b'
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                name = match.group(1)
-                if name not in common_words:
-                    add_entity(name, 'concept')
-        
-        # Convert to formatted entities
-        formatted_entities = []
-        for i, (normalized_name, entity) in enumerate(sorted(entities_dict.items()), 1):
-            entity_id = f"ent_{i:06d}"
-            formatted_entity = {
-                "id": entity_id,
-                "entityType": entity['type'],
-                "name": entity['name'],
-                "aliases": [],
-                "facts": [{
-                    "key": "source",
-                    "value": "extracted from text",
-                    "time": time_id
-                }],
-                "version": 1
-            }
-            formatted_entities.append(formatted_entity)
-        
-        return formatted_entities
-
     def _parse_entities_response(self, response: str, time_id: str) -> List[Dict[str, Any]]:
         """
         Parse LLM response into entity format.
@@ -483,18 +506,19 @@ Answer (person/place/thing/none):"""
                 logger.warning("Empty response from LLM")
                 return []
 
-            # Check if response is JSON (from fallback)
+            # Check if response is JSON (from fallback); the prefix test keeps plain
+            # name lists out of the decoder and its exception path
             if clean_response.startswith("["):
                 try:
-                    raw_entities = json.loads(clean_response)
+                    raw_entities = orjson.loads(clean_response)
                     if isinstance(raw_entities, list):
                         return self._format_entities(raw_entities, time_id)
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     pass
 
             # Parse as comma-separated names (primary path)
             # Split by comma and create character entities
-            names = [n.strip() for n in clean_response.split(",") if n.strip()]
+            names = [name for n in clean_response.split(",") if (name := n.strip())]
             
             if not names:
                 logger.warning("No entity names found in response")
@@ -519,32 +543,39 @@ Answer (person/place/thing/none):"""
         Returns:
             List of formatted entities
         """
-        formatted_entities = []
-        for i, entity in enumerate(raw_entities, 1):
-            entity_id = f"ent_{i:06d}"
-            
-            facts = []
-            for fact in entity.get("facts", []):
-                facts.append({
+        return [self._format_entity(entity, i, time_id) for i, entity in enumerate(raw_entities, 1)]
+
+    def _format_entity(self, entity: Dict[str, Any], index: int, time_id: str) -> Dict[str, Any]:
+        """
+        Format one raw entity into standardized format.
+
+        Args:
+            entity: Raw entity dict
+            index: 1-based position, used for the entity ID
+            time_id: Time identifier for facts
+
+        Returns:
+            Formatted entity
+        """
+        return {
+            "id": f"ent_{index:06d}",
+            "entityType": entity.get("type") or entity.get("entityType", "character"),
+            "name": entity.get("name", "Unnamed"),
+            "aliases": entity.get("aliases", []),
+            "facts": [
+                {
                     "key": fact.get("key", "unknown"),
                     "value": fact.get("value", ""),
                     "time": time_id
-                })
-            
-            formatted_entity = {
-                "id": entity_id,
-                "entityType": entity.get("type") or entity.get("entityType", "character"),
-                "name": entity.get("name", "Unnamed"),
-                "aliases": entity.get("aliases", []),
-                "facts": facts,
-                "version": 1
-            }
-            
-            formatted_entities.append(formatted_entity)
-        
-        return formatted_entities
-
-    async def extract_entities_stream(self, text: str, time_id: str = "t_000"):
+                }
+                for fact in entity.get("facts", ())
+            ],
+            "version": 1
+        }
+
+    async def extract_entities_stream(
+        self, text: str, time_id: str = "t_000"
+    ) -> AsyncIterator[Tuple[bytes, bool, Optional[List[Dict[str, Any]]]]]:
         """
         Stream entity extraction process (for long texts).
 
@@ -553,19 +584,29 @@ Answer (person/place/thing/none):"""
             time_id: Time identifier for facts
 
         Yields:
-            Status updates and final entities
+            Tuples of (NDJSON frame, is_complete, entities). In hybrid mode every
+            entity gets a "partial" frame as soon as it is classified. Entities are
+            only set on the completion frame, so callers never need to parse the frames.
         """
         try:
-            yield json.dumps({"status": "extracting", "message": "Analyzing text for entities..."}) + "\n"
+            yield _EXTRACTING_FRAME, False, None
             
-            entities = await self.extract_entities(text, time_id)
+            if ENTITY_EXTRACTION_MODE == "hybrid":
+                entities = []
+                async for raw_entity in self._iter_entities_hybrid(text):
+                    entity = self._format_entity(raw_entity, len(entities) + 1, time_id)
+                    entities.append(entity)
+                    yield orjson.dumps({"status": "partial", "entity": entity}) + b"\n", False, None
+            else:
+                entities = await self.extract_entities(text, time_id)
             
-            yield json.dumps({
+            frame = orjson.dumps({
                 "status": "complete",
                 "message": f"Extracted {len(entities)} entities",
                 "entities": entities
-            }) + "\n"
+            }) + b"\n"
+            yield frame, True, entities
             
         except Exception as e:
             logger.error(f"Error in stream extraction: {e}")
-            yield json.dumps({"status": "error", "message": str(e)}) + "\n"
+            yield orjson.dumps({"status": "error", "message": str(e)}) + b"\n", False, None
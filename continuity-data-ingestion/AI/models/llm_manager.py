@@ -1,13 +1,15 @@
 """Local LLM management using llama-cpp-python and Phi 4."""
 import asyncio
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import AsyncGenerator
 import time
 
-from llama_cpp import Llama
+from llama_cpp import GGML_TYPE_F16, GGML_TYPE_Q8_0, Llama
+from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
 
-from config.settings import MODEL_PATH, RESPONSE_TIMEOUT
+from config.settings import MODEL_PATH, RESPONSE_TIMEOUT, LLM_THREADS, LLM_DRAFT_TOKENS, LLM_FLASH_ATTN
 
 logger = logging.getLogger(__name__)
 
@@ -29,13 +31,26 @@ class LLMManager:
         # Load model with llama-cpp-python
         # n_gpu_layers: adjust based on your GPU VRAM; 0 for CPU-only
         # n_ctx: context window size - increased for entity extraction
+        # Without flash attention llama.cpp only supports an f16 V cache, so q8_0 is
+        # used for both K and V only when it's on
+        kv_type = GGML_TYPE_Q8_0 if LLM_FLASH_ATTN else GGML_TYPE_F16
         self.llm = Llama(
             model_path=self.model_path,
             n_ctx=4096,  # wider context for stability
-            n_threads=4,
+            n_threads=LLM_THREADS,
             n_gpu_layers=0,  # CPU-only mode
             n_batch=32,      # smaller batch to avoid GGML assertions
             n_ubatch=32,
+            flash_attn=LLM_FLASH_ATTN,
+            type_k=kv_type,  # q8_0 halves the 4096-token KV cache
+            type_v=kv_type,
+            use_mmap=True,  # weights are paged in from the GGUF file, not copied
+            use_mlock=False,
+            # Speculative decoding: draft tokens by n-gram lookup in the prompt (RAG
+            # answers copy heavily from the retrieved context) and verify them in one pass
+            draft_model=LlamaPromptLookupDecoding(num_pred_tokens=LLM_DRAFT_TOKENS)
+            if LLM_DRAFT_TOKENS > 0
+            else None,
             verbose=False,
         )
         self.model = self.model_path
@@ -102,7 +117,11 @@ class LLMManager:
 
         try:
             stream = await loop.run_in_executor(None, _get_stream)
-            for chunk in stream:
+            # Each step decodes a token, so pull chunks on a worker thread, not the event loop
+            while True:
+                chunk = await loop.run_in_executor(None, next, stream, None)
+                if chunk is None:
+                    break
                 token = chunk["choices"][0]["text"]
                 if token:
                     yield token
@@ -110,6 +129,17 @@ class LLMManager:
             logger.error(f"Error in stream generation: {e}")
             raise
 
+    async def generate_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+    ) -> AsyncGenerator[str, None]:
+        """Stream response tokens, holding the inference lock until the stream ends."""
+        async with self._lock:
+            async for token in self._generate_stream(prompt, temperature, top_p):
+                yield token
+
     async def generate_json(
         self,
         prompt: str,
@@ -225,3 +255,18 @@ class LLMManager:
             return False
 
 
+@lru_cache(maxsize=None)
+def get_llm_manager(model_path: str = MODEL_PATH) -> LLMManager:
+    """
+    Get the shared LLMManager for a GGUF file.
+
+    The model is loaded once per process; every caller gets the same instance
+    and therefore the same weights and inference lock.
+
+    Args:
+        model_path: Path to the GGUF model file
+
+    Returns:
+        Cached LLMManager instance
+    """
+    return LLMManager(model_path)
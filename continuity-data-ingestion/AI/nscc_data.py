@@ -114,11 +114,11 @@ events_metadata = [
 
 def load_nscc_pages():
     """Load NSCC website pages into knowledge base."""
-    from database.vector_db import VectorDB
+    from database.vector_db import get_vector_db
     import logging
     
     logger = logging.getLogger(__name__)
-    db = VectorDB(collection_name="documents")
+    db = get_vector_db("documents")
     
     logger.info(f"Adding {len(nscc_pages_documents)} NSCC website documents...")
     db.add_documents(nscc_pages_documents, metadata=nscc_pages_metadata)
@@ -131,11 +131,11 @@ def load_nscc_pages():
 
 def load_nscc_faq():
     """Load NSCC FAQ into knowledge base."""
-    from database.vector_db import VectorDB
+    from database.vector_db import get_vector_db
     import logging
     
     logger = logging.getLogger(__name__)
-    db = VectorDB(collection_name="documents")
+    db = get_vector_db("documents")
     
     logger.info(f"Adding {len(nscc_faq_documents)} NSCC FAQ documents...")
     db.add_documents(nscc_faq_documents, metadata=nscc_faq_metadata)
@@ -1,8 +1,10 @@
 """Retrieval-Augmented Generation pipeline."""
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
 
+import numpy as np
+
 from database.vector_db import VectorDB
 from models.llm_manager import LLMManager
 from rag.prompt_builder import PromptBuilder
@@ -33,6 +35,7 @@ class RAGPipeline:
         chat_history: List[Dict[str, str]] = None,
         top_k: int = TOP_K_RESULTS,
         use_context: bool = True,
+        precomputed_embedding: Optional[np.ndarray] = None,
     ) -> Tuple[str, List[Dict[str, Any]]]:
         """
         Process a user query through the RAG pipeline.
@@ -42,6 +45,7 @@ class RAGPipeline:
             chat_history: Previous conversation messages
             top_k: Number of context documents to retrieve
             use_context: Whether to use retrieved context
+            precomputed_embedding: Query embedding the caller already computed; reused for retrieval
 
         Returns:
             Tuple of (generated_response, source_documents)
@@ -49,7 +53,7 @@ class RAGPipeline:
         try:
             # Step 1: Retrieve relevant context
             if use_context:
-                context_docs = self._retrieve_context(user_query, top_k)
+                context_docs = await self.retrieve_context(user_query, top_k, precomputed_embedding)
                 logger.info(f"Retrieved {len(context_docs)} context documents")
             else:
                 context_docs = []
@@ -82,6 +86,7 @@ class RAGPipeline:
         user_query: str,
         chat_history: List[Dict[str, str]] = None,
         top_k: int = TOP_K_RESULTS,
+        context_docs: List[Dict[str, Any]] = None,
     ):
         """
         Stream response from RAG pipeline (generator).
@@ -90,13 +95,15 @@ class RAGPipeline:
             user_query: The user's question
             chat_history: Previous conversation messages
             top_k: Number of context documents to retrieve
+            context_docs: Already-retrieved context; skips retrieval when given
 
         Yields:
             Response tokens as they're generated
         """
         try:
             # Retrieve context
-            context_docs = self._retrieve_context(user_query, top_k)
+            if context_docs is None:
+                context_docs = await self.retrieve_context(user_query, top_k)
 
             # Build prompt
             prompt = self.prompt_builder.build_rag_prompt(
@@ -106,7 +113,7 @@ class RAGPipeline:
             )
 
             # Stream response
-            async for token in self.llm_manager._generate_stream(
+            async for token in self.llm_manager.generate_stream(
                 prompt=prompt,
                 temperature=0.7,
                 top_p=0.9,
@@ -117,27 +124,28 @@ class RAGPipeline:
             logger.error(f"Error in stream query: {e}")
             raise
 
-    def _retrieve_context(
+    async def retrieve_context(
         self,
         query: str,
         top_k: int = TOP_K_RESULTS,
+        query_embedding: Optional[np.ndarray] = None,
     ) -> List[Dict[str, Any]]:
         """Retrieve context documents for a query."""
         try:
-            results = self.vector_db.search(query, top_k=top_k)
+            results = await self.vector_db.search_async(query, top_k=top_k, query_embedding=query_embedding)
             return results
         except Exception as e:
             logger.error(f"Error retrieving context: {e}")
             return []
 
-    def add_knowledge_base(
+    async def add_knowledge_base(
         self,
         documents: List[str],
         metadata: List[Dict[str, Any]] = None,
     ) -> None:
         """Add documents to the knowledge base."""
         try:
-            self.vector_db.add_documents(documents, metadata)
+            await self.vector_db.add_documents_async(documents, metadata)
             logger.info(f"Added {len(documents)} documents to knowledge base")
         except Exception as e:
             logger.error(f"Error adding documents: {e}")
@@ -0,0 +1,119 @@
+"""Semantic response cache for the RAG pipeline."""
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+
+def history_key(chat_history: List[Dict[str, str]]) -> str:
+    """
+    Hash a conversation so answers are only reused within the same context.
+
+    Args:
+        chat_history: Previous messages, excluding the query being answered
+
+    Returns:
+        Hex digest of the roles and contents
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for msg in chat_history or []:
+        digest.update(msg.get("role", "").encode())
+        digest.update(b"\x00")
+        digest.update(msg.get("content", "").encode())
+        digest.update(b"\x01")
+    return digest.hexdigest()
+
+
+class SemanticCache:
+    """Caches RAG answers by query embedding so paraphrased repeats skip the LLM."""
+
+    def __init__(
+        self,
+        max_entries: int = SEMANTIC_CACHE_SIZE,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            max_entries: Maximum number of cached answers (LRU eviction)
+            threshold: Minimum cosine similarity for a cached answer to be reused
+        """
+        self.max_entries = max(1, max_entries)
+        self.threshold = threshold
+        # Row i holds the unit-length query embedding for slot i
+        self._embeddings: Optional[np.ndarray] = None
+        self._used = np.zeros(self.max_entries, dtype=bool)
+        # slot -> (history key, response, sources), in LRU order (oldest first)
+        self._entries: "OrderedDict[int, Tuple[str, str, List[Dict[str, Any]]]]" = OrderedDict()
+
+    def lookup(
+        self,
+        embedding: np.ndarray,
+        context_key: str,
+    ) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Find a cached answer for a semantically equivalent query.
+
+        Args:
+            embedding: Unit-length query embedding
+            context_key: history_key() of the conversation so far
+
+        Returns:
+            Tuple of (response, sources), or None on a miss
+        """
+        if not self._entries:
+            return None
+
+        # Embeddings are unit-length, so the dot product is the cosine similarity
+        similarities = self._embeddings @ embedding
+        similarities[~self._used] = -1.0
+        for slot in np.argsort(similarities)[::-1]:
+            if similarities[slot] < self.threshold:
+                break
+            cached_key, response, sources = self._entries[int(slot)]
+            if cached_key == context_key:
+                self._entries.move_to_end(int(slot))
+                logger.debug(f"Semantic cache hit (similarity {similarities[slot]:.3f})")
+                return response, sources
+        return None
+
+    def store(
+        self,
+        embedding: np.ndarray,
+        context_key: str,
+        response: str,
+        sources: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Cache an answer, evicting the least recently used one when full.
+
+        Args:
+            embedding: Unit-length query embedding
+            context_key: history_key() of the conversation so far
+            response: Generated response
+            sources: Source documents used for the response
+        """
+        if self._embeddings is None:
+            self._embeddings = np.zeros((self.max_entries, embedding.shape[0]), dtype=np.float32)
+
+        if len(self._entries) < self.max_entries:
+            slot = int(np.flatnonzero(~self._used)[0])
+        else:
+            slot, _ = self._entries.popitem(last=False)
+
+        self._embeddings[slot] = embedding
+        self._used[slot] = True
+        self._entries[slot] = (context_key, response, sources)
+
+    def clear(self) -> None:
+        """Drop every cached answer, e.g. after the knowledge base changes."""
+        self._entries.clear()
+        self._used[:] = False
+        logger.debug("Semantic cache cleared")
@@ -1,5 +1,7 @@
 """Context and session management."""
 import logging
+from collections import deque
+from itertools import islice
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
@@ -32,11 +34,13 @@ class ContextManager:
         Returns:
             Session dict
         """
+        now = datetime.now()
         session = {
             "user_id": user_id,
-            "created_at": datetime.now(),
-            "last_activity": datetime.now(),
-            "messages": [],
+            "created_at": now,
+            "last_activity": now,
+            # Ring buffer: appends drop the oldest message once max_history is reached
+            "messages": deque(maxlen=self.max_history),
             "metadata": {},
         }
         self.sessions[user_id] = session
@@ -69,17 +73,11 @@ class ContextManager:
             content: Message content
         """
         session = self.get_session(user_id)
-        
-        message = {
+        session["messages"].append({
             "role": role,
             "content": content,
-            "timestamp": datetime.now(),
-        }
-        session["messages"].append(message)
-
-        # Keep only recent messages
-        if len(session["messages"]) > self.max_history:
-            session["messages"] = session["messages"][-self.max_history :]
+            "timestamp": session["last_activity"],
+        })
 
         logger.debug(f"Added {role} message for user: {user_id}")
 
@@ -95,21 +93,18 @@ class ContextManager:
             List of message dicts
         """
         session = self.get_session(user_id)
+        messages = session["messages"]
         max_messages = max_messages or self.max_history
 
-        history = [
-            {
-                "role": msg["role"],
-                "content": msg["content"],
-            }
-            for msg in session["messages"][-max_messages:]
+        return [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in islice(messages, max(0, len(messages) - max_messages), None)
         ]
-        return history
 
     def clear_history(self, user_id: str) -> None:
         """Clear conversation history for a user."""
         if user_id in self.sessions:
-            self.sessions[user_id]["messages"] = []
+            self.sessions[user_id]["messages"].clear()
             logger.info(f"Cleared history for user: {user_id}")
 
     def delete_session(self, user_id: str) -> None:
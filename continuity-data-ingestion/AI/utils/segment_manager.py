@@ -96,7 +96,7 @@ class SegmentManager:
             )
 
             # Store chunks in vector database
-            segment_id = self.vector_db.add_documents(
+            segment_id = await self.vector_db.add_documents_async(
                 documents=[chunk["text"] for chunk in chunks],
                 ids=[chunk["id"] for chunk in chunks],
                 metadata=[chunk["metadata"] for chunk in chunks],
@@ -184,7 +184,7 @@ class SegmentManager:
     async def delete_segment(self, segment_id: str) -> Dict[str, Any]:
         """Delete a segment and its chunks."""
         try:
-            self.vector_db.delete_documents(segment_id)
+            await self.vector_db.delete_documents_async(segment_id)
             return {"status": "success", "message": f"Segment {segment_id} deleted"}
         except Exception as e:
             logger.error(f"Failed to delete segment: {e}")
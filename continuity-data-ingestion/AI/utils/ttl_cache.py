@@ -0,0 +1,41 @@
+"""Short-lived response caching for cheap-to-serve endpoints."""
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+
+def async_ttl_cache(
+    ttl: float,
+    version: Callable[[], Any] = lambda: None,
+) -> Callable[[Callable[[], Awaitable[Any]]], Callable[[], Awaitable[Any]]]:
+    """
+    Cache the result of an argument-less coroutine function.
+
+    The cached value is reused for ``ttl`` seconds, or until ``version()``
+    returns something different (bump it to invalidate early). Exceptions
+    are never cached.
+
+    Args:
+        ttl: Time-to-live in seconds
+        version: Callable returning the current cache version
+
+    Returns:
+        Decorator wrapping the coroutine function
+    """
+    def decorator(func: Callable[[], Awaitable[Any]]) -> Callable[[], Awaitable[Any]]:
+        slot: Dict[str, Any] = {}
+
+        @functools.wraps(func)
+        async def wrapper() -> Any:
+            now = time.monotonic()
+            current_version = version()
+            if slot and slot["version"] == current_version and now - slot["at"] < ttl:
+                return slot["value"]
+
+            value = await func()
+            slot.update(version=current_version, at=now, value=value)
+            return value
+
+        return wrapper
+
+    return decorator